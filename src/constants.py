@@ -4,14 +4,15 @@ import pkgutil
 from inspect import isclass, getfile, getmodule
 from pathlib import Path
 
-from games.connect4.simulator import Connect4Simulator
+from games.connect4.simulator import Connect4Simulator, BitboardConnect4Simulator
 from games.hlpoker.simulator import HLPokerSimulator
 from games.minesweeper.simulator import MinesweeperSimulator
 
 AVAILABLE_GAME_TYPES = {
-    "hlpoker":      HLPokerSimulator,
-    "connect4":     Connect4Simulator,
-    "minesweeper":  MinesweeperSimulator
+    "hlpoker":              HLPokerSimulator,
+    "connect4":             Connect4Simulator,
+    "connect4-bitboard":    BitboardConnect4Simulator,
+    "minesweeper":          MinesweeperSimulator
 }
 
 
@@ -37,7 +38,9 @@ def __get_player_types(base_class):
             module = importlib.import_module(modname)
             for attribute_name in dir(module):
                 attribute = getattr(module, attribute_name)
-                if isclass(attribute) and issubclass(attribute, base_class) and attribute is not base_class:
+                # classes starting with _ are private helpers of the players (e.g. the workers of a search)
+                if isclass(attribute) and issubclass(attribute, base_class) and attribute is not base_class \
+                        and not attribute_name.startswith('_'):
                     subclasses.append(attribute)
         except ImportError:
             continue  # Skip modules that can't be imported
@@ -9,3 +9,9 @@ class Connect4Action:
 
     def get_col(self):
         return self.__col
+
+    def __eq__(self, other):
+        return isinstance(other, Connect4Action) and self.__col == other.__col
+
+    def __hash__(self):
+        return hash(self.__col)
@@ -0,0 +1,298 @@
+from termcolor import colored
+
+from games.connect4.action import Connect4Action
+from games.connect4.result import Connect4Result
+from games.connect4.state import Connect4State
+from games.connect4.windows import WindowCounts
+from games.state import State
+
+
+class BitboardConnect4State(State):
+    """
+    A Connect4 state backed by bitboards, with the same interface as Connect4State.
+
+    Each column takes num_rows + 1 bits (the extra bit on top of each column is always empty, so lines can't wrap
+    from one column to the next). The bit of the cell at height h (0 is the bottom) of column c is c * (num_rows + 1) + h.
+    The position is stored as one integer mask per player plus the height of each column, so cloning a state
+    only copies a couple of integers and the win detection is a handful of shifts and ANDs.
+    """
+    EMPTY_CELL = Connect4State.EMPTY_CELL
+
+    def __init__(self, num_rows: int = 6, num_cols: int = 7):
+        super().__init__()
+
+        if num_rows < 4:
+            raise Exception("the number of rows must be 4 or over")
+        if num_cols < 4:
+            raise Exception("the number of cols must be 4 or over")
+
+        """
+        the dimensions of the board
+        """
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+
+        """
+        the checkers of each player
+        """
+        self.__boards = [0, 0]
+
+        """
+        the checkers of each player in the mirrored position (left to right)
+        """
+        self.__mirrored_boards = [0, 0]
+
+        """
+        the number of checkers in each column
+        """
+        self.__heights = [0] * num_cols
+
+        """
+        counts the number of turns in the current game
+        """
+        self.__turns_count = 1
+
+        """
+        the index of the current acting player
+        """
+        self.__acting_player = 0
+
+        """
+        determine if a winner was found already
+        """
+        self.__has_winner = False
+
+        """
+        the grid built from the bitboards (only when requested, it is discarded on each update)
+        """
+        self.__grid = None
+
+        """
+        the moves performed with apply, as (col, had_winner), so they can be reverted with undo
+        """
+        self.__applied_moves = []
+
+        """
+        the zobrist keys of this board size (shared with Connect4State), and the zobrist hash of the current position
+        """
+        self.__zobrist = Connect4State.get_zobrist_keys(num_rows, num_cols)
+        self.__hash = 0
+
+        """
+        the checkers of each player in every window of 4 cells, used to evaluate positions, updated on each move
+        """
+        self.__windows = WindowCounts(num_rows, num_cols)
+
+    @staticmethod
+    def has_four(board: int, num_rows: int) -> bool:
+        # shifts for the vertical, horizontal and both diagonal directions
+        column_height = num_rows + 1
+        for shift in (1, column_height, column_height - 1, column_height + 1):
+            pairs = board & (board >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    def get_bit(self, row: int, col: int) -> int:
+        return 1 << (col * (self.__num_rows + 1) + (self.__num_rows - 1 - row))
+
+    def get_board(self, player: int) -> int:
+        return self.__boards[player]
+
+    def get_mask(self) -> int:
+        return self.__boards[0] | self.__boards[1]
+
+    def get_heights(self):
+        return self.__heights
+
+    def get_grid(self):
+        if self.__grid is None:
+            self.__grid = [[BitboardConnect4State.EMPTY_CELL for _i in range(self.__num_cols)] for _j in range(self.__num_rows)]
+            for col in range(0, self.__num_cols):
+                for height in range(0, self.__heights[col]):
+                    row = self.__num_rows - 1 - height
+                    self.__grid[row][col] = 0 if self.__boards[0] & self.get_bit(row, col) else 1
+        return self.__grid
+
+    """
+    the player of the checker in a cell, or EMPTY_CELL. Unlike get_grid, it is not copied when read through a StateView
+    """
+    def get_cell(self, row: int, col: int) -> int:
+        bit = self.get_bit(row, col)
+        if self.__boards[0] & bit:
+            return 0
+        if self.__boards[1] & bit:
+            return 1
+        return BitboardConnect4State.EMPTY_CELL
+
+    def get_num_players(self):
+        return 2
+
+    def validate_action(self, action: Connect4Action) -> bool:
+        col = action.get_col()
+
+        # valid column
+        if col < 0 or col >= self.__num_cols:
+            return False
+
+        # full column
+        if self.__heights[col] >= self.__num_rows:
+            return False
+
+        return True
+
+    def update(self, action: Connect4Action):
+        col = action.get_col()
+
+        # drop the checker
+        self.__boards[self.__acting_player] |= 1 << (col * (self.__num_rows + 1) + self.__heights[col])
+        self.__mirrored_boards[self.__acting_player] |= \
+            1 << ((self.__num_cols - 1 - col) * (self.__num_rows + 1) + self.__heights[col])
+        self.__hash ^= self.__zobrist[self.__acting_player][self.__num_rows - 1 - self.__heights[col]][col]
+        self.__windows.add(self.__num_rows - 1 - self.__heights[col], col, self.__acting_player)
+        self.__heights[col] += 1
+        self.__grid = None
+
+        # determine if there is a winner
+        self.__has_winner = BitboardConnect4State.has_four(self.__boards[self.__acting_player], self.__num_rows)
+
+        # switch to next player
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+
+        self.__turns_count += 1
+
+    def apply(self, action: Connect4Action):
+        self.__applied_moves.append((action.get_col(), self.__has_winner))
+        self.update(action)
+
+    def undo(self):
+        col, had_winner = self.__applied_moves.pop()
+
+        # switch back to the previous player and remove its top checker of the column
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+        self.__heights[col] -= 1
+        self.__boards[self.__acting_player] &= ~(1 << (col * (self.__num_rows + 1) + self.__heights[col]))
+        self.__mirrored_boards[self.__acting_player] &= \
+            ~(1 << ((self.__num_cols - 1 - col) * (self.__num_rows + 1) + self.__heights[col]))
+        self.__hash ^= self.__zobrist[self.__acting_player][self.__num_rows - 1 - self.__heights[col]][col]
+        self.__windows.remove(self.__num_rows - 1 - self.__heights[col], col, self.__acting_player)
+        self.__grid = None
+
+        self.__turns_count -= 1
+        self.__has_winner = had_winner
+
+    def __display_cell(self, row, col):
+        cell_value = self.get_grid()[row][col]
+        if cell_value == 0:
+            # Player 1 - Red
+            print(colored('●', 'red'), end="")
+        elif cell_value == 1:
+            # Player 2 - Blue
+            print(colored('○', 'blue'), end="")
+        else:
+            # Empty cell
+            print(' ', end="")
+
+    def __display_numbers(self):
+        for col in range(0, self.__num_cols):
+            if col < 10:
+                print(' ', end="")
+            print(col, end="")
+        print("")
+
+    def __display_separator(self):
+        for col in range(0, self.__num_cols):
+            print("--", end="")
+        print("-")
+
+    def display(self):
+        self.__display_numbers()
+        self.__display_separator()
+
+        for row in range(0, self.__num_rows):
+            print('|', end="")
+            for col in range(0, self.__num_cols):
+                self.__display_cell(row, col)
+                print('|', end="")
+            print("")
+            self.__display_separator()
+
+        self.__display_numbers()
+        print("")
+
+    def __is_full(self):
+        return self.__turns_count > (self.__num_cols * self.__num_rows)
+
+    def is_finished(self) -> bool:
+        return self.__has_winner or self.__is_full()
+
+    def get_acting_player(self) -> int:
+        return self.__acting_player
+
+    def clone(self):
+        cloned_state = BitboardConnect4State.__new__(BitboardConnect4State)
+        cloned_state.__num_rows = self.__num_rows
+        cloned_state.__num_cols = self.__num_cols
+        cloned_state.__boards = self.__boards.copy()
+        cloned_state.__mirrored_boards = self.__mirrored_boards.copy()
+        cloned_state.__heights = self.__heights.copy()
+        cloned_state.__turns_count = self.__turns_count
+        cloned_state.__acting_player = self.__acting_player
+        cloned_state.__has_winner = self.__has_winner
+        cloned_state.__grid = None
+        cloned_state.__applied_moves = []
+        cloned_state.__zobrist = self.__zobrist
+        cloned_state.__hash = self.__hash
+        cloned_state.__windows = self.__windows.copy()
+        return cloned_state
+
+    def get_result(self, pos):
+        if self.__has_winner:
+            return Connect4Result.LOOSE.value if pos == self.__acting_player else Connect4Result.WIN.value
+        if self.__is_full():
+            return Connect4Result.DRAW.value
+        return None
+
+    def get_hash(self) -> int:
+        return self.__hash
+
+    """
+    the unique key of the current position (the same key as Connect4State.get_position_key)
+    """
+    def get_position_key(self) -> int:
+        return Connect4State.build_position_key(self.__boards[self.__acting_player], self.get_mask(),
+                                                self.__num_rows, self.__num_cols)
+
+    """
+    the canonical key of the current position (the same key as Connect4State.get_canonical_key)
+    """
+    def get_canonical_key(self):
+        key = self.get_position_key()
+        mirrored_key = Connect4State.build_position_key(self.__mirrored_boards[self.__acting_player],
+                                                        self.__mirrored_boards[0] | self.__mirrored_boards[1],
+                                                        self.__num_rows, self.__num_cols)
+        return (mirrored_key, True) if mirrored_key < key else (key, False)
+
+    """
+    the number of open windows of 4 cells with a number of checkers of a player (see Connect4State)
+    """
+    def get_num_open_windows(self, player: int, num_checkers: int, direction: int = None) -> int:
+        return self.__windows.get_num_open(player, num_checkers, direction)
+
+    """
+    the number of checkers of a player in each window of 4 cells (see WindowCounts.get_occupancy)
+    """
+    def get_window_occupancy(self, player: int):
+        return self.__windows.get_occupancy(player)
+
+    def get_num_rows(self):
+        return self.__num_rows
+
+    def get_num_cols(self):
+        return self.__num_cols
+
+    def before_results(self):
+        pass
+
+    def get_possible_actions(self):
+        return [Connect4Action(col) for col in range(0, self.__num_cols) if self.__heights[col] < self.__num_rows]
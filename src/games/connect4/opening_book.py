@@ -0,0 +1,218 @@
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from games.connect4.action import Connect4Action
+from games.connect4.state import Connect4State
+
+
+class OpeningBook:
+    """
+    A precomputed book of Connect4 openings, stored as a binary file and read through mmap.
+
+    The file has a fixed header followed by one fixed-width record per position, sorted by canonical key
+    (see Connect4State.get_canonical_key), so a position and its mirror image share a record. Each record holds
+    the score of the position for the acting player and the best move of both orientations of the position, as
+    found by MinimaxConnect4Player with the depth stored in the header (the search breaks ties by the lowest column,
+    so the best move of the mirrored position is not always the mirror of the best move).
+    Lookups are a binary search over the mapped file, so opening a book does not parse anything, and all the
+    processes that open the same file share its pages through the page cache.
+    """
+
+    """
+    magic, version, rows, cols, search depth, plies, number of records
+    """
+    HEADER = struct.Struct('<4sBBBBBxxxQ')
+    MAGIC = b'C4OB'
+    VERSION = 2
+
+    """
+    canonical key, score, best move (column) and best move of the mirrored position (as a column of the canonical one)
+    """
+    RECORD = struct.Struct('<QhBB')
+
+    """
+    the default location of the book (built with: python -m games.connect4.opening_book)
+    """
+    DEFAULT_PATH = Path(__file__).parent / 'opening_book.bin'
+
+    """
+    the books already opened by this process, by path
+    """
+    __books = {}
+
+    def __init__(self, path):
+        self.__path = path
+        with open(path, 'rb') as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.__num_rows, self.__num_cols, self.__depth, self.__plies, self.__num_records = \
+            OpeningBook.HEADER.unpack_from(self.__data, 0)
+        if magic != OpeningBook.MAGIC or version != OpeningBook.VERSION:
+            raise ValueError(f"'{path}' is not a Connect4 opening book")
+
+    """
+    opens the book at a path, or returns None if there is no book there. Each path is only mapped once per process
+    """
+    @staticmethod
+    def open(path=DEFAULT_PATH):
+        path = os.path.abspath(path)
+        if path not in OpeningBook.__books:
+            OpeningBook.__books[path] = OpeningBook(path) if os.path.isfile(path) else None
+        return OpeningBook.__books[path]
+
+    def __reduce__(self):
+        # a pickled book (e.g. held by a player sent to another process) maps the file again on the other side
+        return OpeningBook.open, (self.__path,)
+
+    def get_num_rows(self):
+        return self.__num_rows
+
+    def get_num_cols(self):
+        return self.__num_cols
+
+    def get_depth(self):
+        return self.__depth
+
+    def get_plies(self):
+        return self.__plies
+
+    def __len__(self):
+        return self.__num_records
+
+    """
+    retrieves the (best move, score) of a position, or None if the position is not in the book
+    :param key: the canonical key of the position (see Connect4State.get_canonical_key)
+    :param mirrored: if the canonical key is the one of the mirrored position
+    """
+    def lookup(self, key: int, mirrored: bool = False):
+        low, high = 0, self.__num_records
+        while low < high:
+            middle = (low + high) // 2
+            record_key, score, move, mirrored_move = OpeningBook.RECORD.unpack_from(
+                self.__data, OpeningBook.HEADER.size + middle * OpeningBook.RECORD.size)
+            if record_key == key:
+                return (self.__num_cols - 1 - mirrored_move if mirrored else move), score
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    """
+    checks if the book was built for a board size and search depth
+    """
+    def matches(self, num_rows: int, num_cols: int, depth: int) -> bool:
+        return self.__num_rows == num_rows and self.__num_cols == num_cols and self.__depth == depth
+
+
+"""
+finds every position reachable in up to a number of plies where the game is not over yet
+:return: a dictionary with the moves that reach each position, by canonical key (only one of the orientations of
+each position is kept)
+"""
+def enumerate_positions(num_rows: int, num_cols: int, plies: int):
+    positions = {}
+    state = Connect4State(num_rows, num_cols)
+    moves = []
+
+    def visit():
+        key, _ = state.get_canonical_key()
+        if key in positions or state.is_finished():
+            return
+        positions[key] = tuple(moves)
+        if len(moves) == plies:
+            return
+        for action in state.get_possible_actions():
+            state.apply(action)
+            moves.append(action.get_col())
+            visit()
+            moves.pop()
+            state.undo()
+
+    visit()
+    return positions
+
+
+"""
+searches a list of positions (given as the moves that reach them) with MinimaxConnect4Player, in both orientations
+:return: the list of records (canonical key, score, best move, best move of the mirrored position) of the positions
+"""
+def score_positions(num_rows: int, num_cols: int, depth: int, positions):
+    # imported here since the players consult the book
+    from games.connect4.players.minimax import MinimaxConnect4Player
+
+    player = MinimaxConnect4Player("book", depth, opening_book=None)
+    def search(moves):
+        state = Connect4State(num_rows, num_cols)
+        for col in moves:
+            state.update(Connect4Action(col))
+        player.event_new_game()
+        player.set_current_pos(state.get_acting_player())
+        score, action = player.search_root(state, depth)
+        return state, int(score), action.get_col()
+
+    records = []
+    for moves in positions:
+        mirrored_moves = [num_cols - 1 - col for col in moves]
+        state, score, move = search(moves)
+        key, mirrored = state.get_canonical_key()
+        if mirrored:
+            # the moves reach the mirror image of the canonical position
+            moves, mirrored_moves = mirrored_moves, moves
+            state, score, move = search(moves)
+
+        if Connect4State.mirror_position_key(key, num_rows, num_cols) == key:
+            # symmetric position, the record is never read as mirrored
+            mirrored_move = num_cols - 1 - move
+        else:
+            _, _, mirrored_move = search(mirrored_moves)
+            mirrored_move = num_cols - 1 - mirrored_move
+        records.append((key, score, move, mirrored_move))
+    return records
+
+
+"""
+builds the opening book of all the positions up to a number of plies, and writes it to path
+"""
+def build(path, num_rows: int = 6, num_cols: int = 7, plies: int = 8, depth: int = 4, workers: int = None,
+          chunk_size: int = 1000):
+    positions = list(enumerate_positions(num_rows, num_cols, plies).values())
+    chunks = [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+    print(f"Scoring {len(positions)} positions up to {plies} plies with depth {depth}...")
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_records in executor.map(score_positions, [num_rows] * len(chunks), [num_cols] * len(chunks),
+                                          [depth] * len(chunks), chunks):
+            records.extend(chunk_records)
+    records.sort()
+
+    with open(path, 'wb') as file:
+        file.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.VERSION, num_rows, num_cols, depth, plies,
+                                           len(records)))
+        for record in records:
+            file.write(OpeningBook.RECORD.pack(*record))
+    print(f"Wrote {len(records)} positions to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the Connect4 opening book.')
+    parser.add_argument('--output', default=str(OpeningBook.DEFAULT_PATH),
+                        help='Path of the book file. Defaults to the location the players read it from.')
+    parser.add_argument('--plies', type=int, default=8,
+                        help='Positions up to this number of plies are included. Defaults to 8.')
+    parser.add_argument('--depth', type=int, default=4,
+                        help='Depth of the minimax search that scores the positions. Only the minimax players with this depth use the book. Defaults to 4.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes. Defaults to the number of cpus.')
+    args = parser.parse_args()
+
+    build(args.output, plies=args.plies, depth=args.depth, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
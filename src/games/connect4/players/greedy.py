@@ -7,6 +7,8 @@ from games.state import State
 
 class GreedyConnect4Player(Connect4Player):
 
+    SUBSCRIBED_EVENTS = frozenset()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -1,10 +1,14 @@
 from games.connect4.action import Connect4Action
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
+from games.connect4.windows import WindowCounts
 import random
 
 class HeuristicConnect4Player(Connect4Player):
 
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -13,6 +17,8 @@ class HeuristicConnect4Player(Connect4Player):
         best_action = None
         best_score = -float('inf')
 
+        # the actions are evaluated on a single copy of the state with apply/undo
+        state = state.clone()
         for action in state.get_possible_actions():
             score = self.evaluate_action(state, action)
             if score > best_score:
@@ -23,11 +29,12 @@ class HeuristicConnect4Player(Connect4Player):
 
     def evaluate_action(self, state: Connect4State, action: Connect4Action) -> float:
         # Evaluate the desirability of taking 'action' in 'state'
-        cloned_state = state.clone()
-        cloned_state.update(action)
+        state.apply(action)
 
         # Simple heuristic: prioritize moves that contribute to potential winning configurations
-        return self.evaluate_state(cloned_state)
+        score = self.evaluate_state(state)
+        state.undo()
+        return score
 
     def evaluate_state(self, state: Connect4State) -> float:
         # Evaluate the desirability of the current state for the current player
@@ -35,16 +42,8 @@ class HeuristicConnect4Player(Connect4Player):
         opponent_player = 1 - current_player
 
         # Example: Evaluate based on the number of pieces in potential winning configurations
-        score = 0
-
-        # Check horizontally
-        for row in range(state.get_num_rows()):
-            for col in range(state.get_num_cols() - 3):
-                window = [state.get_grid()[row][col + i] for i in range(4)]
-                if window.count(current_player) == 3 and window.count(state.EMPTY_CELL) == 1:
-                    score += 1
-
-        return score
+        # (the horizontal windows with 3 checkers of the current player and an empty cell)
+        return state.get_num_open_windows(current_player, 3, WindowCounts.HORIZONTAL)
 
     def event_action(self, pos: int, action, new_state: Connect4State):
         # Ignore
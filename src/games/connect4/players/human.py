@@ -8,6 +8,8 @@ from games.connect4.state import Connect4State
 
 class HumanConnect4Player(Connect4Player):
 
+    SUBSCRIBED_EVENTS = frozenset({"event_end_game"})
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -0,0 +1,93 @@
+from time import perf_counter
+
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+from math import inf
+
+
+class SearchTimeout(Exception):
+    """
+    raised inside the search when the time budget of the move is exhausted
+    """
+    pass
+
+
+class IterativeMinimaxConnect4Player(MinimaxConnect4Player):
+    """
+    Minimax with iterative deepening and a time budget per move.
+    The search is repeated with depth 1, 2, 3, ... until the time budget runs out, the game tree is fully
+    searched, or the outcome of the game is proven. The move of the deepest completed iteration is returned.
+    The moves are tried from the center column outwards, after the best move of the previous iteration, which
+    is read back from the transposition table (the principal variation).
+    Note: the depth reached depends on the speed of the machine, so this player is not deterministic.
+    """
+
+    DETERMINISTIC = False
+
+    """
+    the number of nodes searched between two checks of the clock
+    """
+    CLOCK_CHECK_INTERVAL = 256
+
+    """
+    :param time_limit: the time budget of each move, in seconds
+    :param depth: the maximum depth of the search
+    :param transposition_table_bytes: the memory cap of the transposition table (0 disables the table)
+    """
+    def __init__(self, name, time_limit=0.1, depth=64, transposition_table_bytes=4 * 1024 * 1024):
+        super().__init__(name, depth, transposition_table_bytes)
+        self.time_limit = time_limit
+        self.__deadline = inf
+        self.__nodes = 0
+        self.__center = 0
+
+        """
+        stats of the searches: number of moves and sum of the completed depths
+        """
+        self.__num_searches = 0
+        self.__total_depth = 0
+
+    def get_action(self, state: Connect4State):
+        state = state.clone()
+        num_empty_cells = state.get_num_rows() * state.get_num_cols() - sum(
+            1 for row in state.get_grid() for cell in row if cell != Connect4State.EMPTY_CELL)
+        max_depth = min(self.max_depth, num_empty_cells)
+        self.__center = (state.get_num_cols() - 1) / 2
+
+        best_action = None
+        completed_depth = 0
+        self.__nodes = 0
+        deadline = perf_counter() + self.time_limit
+        for depth in range(1, max_depth + 1):
+            # the first iteration always completes, so there is always a move to return
+            self.__deadline = deadline if depth > 1 else inf
+            try:
+                value, action = self.search_root(state, depth)
+            except SearchTimeout:
+                break
+            best_action, completed_depth = action, depth
+
+            # a forced win or loss was found, searching deeper does not change the outcome
+            if abs(value) >= 1000:
+                break
+        self.__deadline = inf
+
+        self.__num_searches += 1
+        self.__total_depth += completed_depth
+        return best_action
+
+    def minimax(self, state: Connect4State, depth, alpha, beta, maximizing_player):
+        self.__nodes += 1
+        if self.__nodes % IterativeMinimaxConnect4Player.CLOCK_CHECK_INTERVAL == 0 and perf_counter() > self.__deadline:
+            raise SearchTimeout()
+        return super().minimax(state, depth, alpha, beta, maximizing_player)
+
+    def order_actions(self, actions, best_col):
+        # center column first, then outwards
+        actions.sort(key=lambda action: abs(action.get_col() - self.__center))
+        return super().order_actions(actions, best_col)
+
+    def print_stats(self):
+        if self.__num_searches > 0:
+            print(f"{self.get_name()}: average completed depth {self.__total_depth / self.__num_searches:.2f} "
+                  f"over {self.__num_searches} moves")
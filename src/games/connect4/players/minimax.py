@@ -1,52 +1,142 @@
 from games.connect4.action import Connect4Action
 from games.connect4.result import Connect4Result
 from games.connect4.player import Connect4Player
+from games.connect4.opening_book import OpeningBook
 from games.connect4.state import Connect4State
+from games.connect4.transposition import TranspositionTable
 from games.state import State
-from math import inf
+from math import inf, nextafter
 import random
 
 class MinimaxConnect4Player(Connect4Player):
-    def __init__(self, name, depth=4):
+
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
+    """
+    :param depth: the depth of the search
+    :param transposition_table_bytes: the memory cap of the transposition table (0 disables the table)
+    :param opening_book: the path of the opening book (None disables the book). The book is only used if it was
+    built with the same depth, so the moves are the same with or without it
+    """
+    def __init__(self, name, depth=4, transposition_table_bytes=4 * 1024 * 1024, opening_book=OpeningBook.DEFAULT_PATH):
         super().__init__(name)
         self.max_depth = depth
+        # the table is kept across the moves of a game, and cleared when a new game starts
+        self.transposition_table = TranspositionTable(transposition_table_bytes) if transposition_table_bytes > 0 else None
+        self.opening_book = OpeningBook.open(opening_book) if opening_book is not None else None
 
     def get_action(self, state: Connect4State):
-        _, action = self.minimax(state, self.max_depth, -inf, inf, True)
+        action = self.get_book_action(state)
+        if action is None:
+            # the search walks a single copy of the state with apply/undo
+            _, action = self.search_root(state.clone(), self.max_depth)
         return action
 
+    """
+    retrieves the move of the opening book for a state, or None if the state is not in the book
+    """
+    def get_book_action(self, state: Connect4State):
+        book = self.opening_book
+        if book is None or not book.matches(state.get_num_rows(), state.get_num_cols(), self.max_depth):
+            return None
+        entry = book.lookup(*state.get_canonical_key())
+        return Connect4Action(entry[0]) if entry is not None else None
+
+    """
+    searches the moves of the acting player and returns the best value and action
+    """
+    def search_root(self, state: Connect4State, depth):
+        table = self.transposition_table
+        entry = table.lookup(state.get_hash()) if table is not None else None
+
+        best_eval = -inf
+        best_action = None
+        for action in self.order_actions(state.get_possible_actions(), entry[3] if entry is not None else None):
+            # between equally good moves the lowest column is chosen, whatever the order of the search: a move of a
+            # lower column than the best so far also gets an exact value when it is only as good
+            is_preferred = best_action is None or action.get_col() < best_action.get_col()
+            alpha = nextafter(best_eval, -inf) if is_preferred else best_eval
+            state.apply(action)
+            eval_child, _ = self.minimax(state, depth - 1, alpha, inf, False)
+            state.undo()
+            if eval_child > best_eval or (eval_child == best_eval and is_preferred):
+                best_eval = eval_child
+                best_action = action
+
+        if table is not None:
+            table.store(state.get_hash(), depth, best_eval, TranspositionTable.EXACT, best_action.get_col())
+        return best_eval, best_action
+
+    def order_actions(self, actions, best_col):
+        # the best move found by a previous search of the position is tried first
+        if best_col is not None:
+            for i, action in enumerate(actions):
+                if action.get_col() == best_col:
+                    actions.insert(0, actions.pop(i))
+                    break
+        return actions
+
     def minimax(self, state: Connect4State, depth, alpha, beta, maximizing_player):
         if depth == 0 or state.is_finished():
             return self.evaluate_state(state), None
 
+        table = self.transposition_table
+        best_col = None
+        if table is not None:
+            key = state.get_hash()
+            entry = table.lookup(key)
+            if entry is not None:
+                entry_depth, value, flag, best_col = entry
+                if entry_depth >= depth and best_col is not None:
+                    if flag == TranspositionTable.EXACT:
+                        return value, Connect4Action(best_col)
+                    if flag == TranspositionTable.LOWER_BOUND:
+                        alpha = max(alpha, value)
+                    elif flag == TranspositionTable.UPPER_BOUND:
+                        beta = min(beta, value)
+                    if beta <= alpha:
+                        return value, Connect4Action(best_col)
+        original_alpha, original_beta = alpha, beta
+
+        actions = self.order_actions(state.get_possible_actions(), best_col)
         if maximizing_player:
-            max_eval = -inf
+            best_eval = -inf
             best_action = None
-            for action in state.get_possible_actions():
-                cloned_state = state.clone()
-                cloned_state.update(action)
-                eval_child, _ = self.minimax(cloned_state, depth - 1, alpha, beta, False)
-                if eval_child > max_eval:
-                    max_eval = eval_child
+            for action in actions:
+                state.apply(action)
+                eval_child, _ = self.minimax(state, depth - 1, alpha, beta, False)
+                state.undo()
+                if eval_child > best_eval:
+                    best_eval = eval_child
                     best_action = action
                 alpha = max(alpha, eval_child)
                 if beta <= alpha:
                     break
-            return max_eval, best_action
         else:
-            min_eval = inf
+            best_eval = inf
             best_action = None
-            for action in state.get_possible_actions():
-                cloned_state = state.clone()
-                cloned_state.update(action)
-                eval_child, _ = self.minimax(cloned_state, depth - 1, alpha, beta, True)
-                if eval_child < min_eval:
-                    min_eval = eval_child
+            for action in actions:
+                state.apply(action)
+                eval_child, _ = self.minimax(state, depth - 1, alpha, beta, True)
+                state.undo()
+                if eval_child < best_eval:
+                    best_eval = eval_child
                     best_action = action
                 beta = min(beta, eval_child)
                 if beta <= alpha:
                     break
-            return min_eval, best_action
+
+        if table is not None:
+            if best_eval <= original_alpha:
+                flag = TranspositionTable.UPPER_BOUND
+            elif best_eval >= original_beta:
+                flag = TranspositionTable.LOWER_BOUND
+            else:
+                flag = TranspositionTable.EXACT
+            table.store(key, depth, best_eval, flag, best_action.get_col())
+
+        return best_eval, best_action
 
     def evaluate_state(self, state: Connect4State):
         if state.is_finished():
@@ -57,32 +147,12 @@ class MinimaxConnect4Player(Connect4Player):
                 return -1000
             else:
                 return 0
-        score = 0
-        grid = state.get_grid()
-        num_rows = state.get_num_rows()
-        num_cols = state.get_num_cols()
-        player = self.get_current_pos()
-
-        for row in range(num_rows):
-            for col in range(num_cols):
-                if grid[row][col] == player:
-                    # Check vertical
-                    if row <= num_rows - 4:
-                        if grid[row + 1][col] == player and grid[row + 2][col] == player and grid[row + 3][col] == player:
-                            score += 100
-                    # Check horizontal
-                    if col <= num_cols - 4:
-                        if grid[row][col + 1] == player and grid[row][col + 2] == player and grid[row][col + 3] == player:
-                            score += 100
-                    # Check diagonal (bottom-left to top-right)
-                    if row <= num_rows - 4 and col >= 3:
-                        if grid[row + 1][col - 1] == player and grid[row + 2][col - 2] == player and grid[row + 3][col - 3] == player:
-                            score += 100
-                    # Check diagonal (top-left to bottom-right)
-                    if row <= num_rows - 4 and col <= num_cols - 4:
-                        if grid[row + 1][col + 1] == player and grid[row + 2][col + 2] == player and grid[row + 3][col + 3] == player:
-                            score += 100
-        return score
+        # 100 points for each line of 4 of the player
+        return 100 * state.get_num_open_windows(self.get_current_pos(), 4)
+
+    def event_new_game(self):
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
 
     def event_action(self, pos: int, action, new_state: State):
         pass
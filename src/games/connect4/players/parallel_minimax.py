@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import RawArray
+from time import perf_counter
+
+from games.connect4.action import Connect4Action
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+from games.state import State
+from math import inf, nextafter
+
+"""
+state of each worker process: the searcher (with its own transposition table), the game it is playing and the
+values found so far for the moves of the root, shared by all the workers
+"""
+_worker_searcher = None
+_worker_game = None
+_worker_root_values = None
+
+
+def _init_worker(root_values, depth, transposition_table_bytes):
+    global _worker_searcher, _worker_root_values
+    _worker_root_values = root_values
+    _worker_searcher = _RootMoveSearcher(depth, transposition_table_bytes)
+
+
+def _search_root_move(state: Connect4State, col: int, depth: int, pos: int, game: int):
+    global _worker_game
+    if game != _worker_game:
+        _worker_searcher.event_new_game()
+        _worker_game = game
+    _worker_searcher.set_current_pos(pos)
+    return _worker_searcher.search_move(state, col, depth, _worker_root_values)
+
+
+class _RootMoveSearcher(MinimaxConnect4Player):
+    """
+    Searches a single move of the root on behalf of ParallelMinimaxConnect4Player.
+    """
+
+    def __init__(self, depth, transposition_table_bytes):
+        super().__init__("worker", depth, transposition_table_bytes, opening_book=None)
+        self.__nodes = 0
+
+    """
+    the lower bound for the value of the move in col: the move is only chosen if it is better than the moves of
+    the lower columns, or at least as good as the moves of the higher columns
+    """
+    @staticmethod
+    def get_alpha(root_values, col):
+        alpha = -inf
+        for other_col, value in enumerate(root_values):
+            if other_col < col:
+                alpha = max(alpha, value)
+            elif other_col > col:
+                alpha = max(alpha, nextafter(value, -inf))
+        return alpha
+
+    """
+    searches the move in col and returns (value, alpha, nodes). The value is exact if it is greater than alpha,
+    otherwise it is only an upper bound of the value of the move
+    """
+    def search_move(self, state: Connect4State, col: int, depth: int, root_values):
+        self.__nodes = 1
+        state.apply(Connect4Action(col))
+
+        alpha = self.get_alpha(root_values, col)
+        if depth <= 1 or state.is_finished():
+            value = self.evaluate_state(state)
+        else:
+            # the move of the root is a min node, searched here so the alpha published by the other workers can be
+            # picked up before each of its children
+            table = self.transposition_table
+            entry = table.lookup(state.get_hash()) if table is not None else None
+            value = inf
+            beta = inf
+            for action in self.order_actions(state.get_possible_actions(), entry[3] if entry is not None else None):
+                alpha = max(alpha, self.get_alpha(root_values, col))
+                state.apply(action)
+                eval_child, _ = self.minimax(state, depth - 2, alpha, beta, True)
+                state.undo()
+                value = min(value, eval_child)
+                beta = min(beta, eval_child)
+                if beta <= alpha:
+                    break
+
+        # publish the value when it is exact, so the other workers can prune with it
+        if value > alpha:
+            root_values[col] = value
+        return value, alpha, self.__nodes
+
+    def minimax(self, state: Connect4State, depth, alpha, beta, maximizing_player):
+        self.__nodes += 1
+        return super().minimax(state, depth, alpha, beta, maximizing_player)
+
+
+class ParallelMinimaxConnect4Player(MinimaxConnect4Player):
+    """
+    Minimax where the moves of the root are searched in parallel by a pool of worker processes.
+    The pool is created on the first move of a game and reused for its other moves, and it is shut down when the game
+    ends (or when the player is used as a context manager and the block exits). Each worker publishes
+    the value of the moves it searched, and the other workers raise their alpha bound with it as soon as it is
+    available. It always returns the same move as MinimaxConnect4Player with the same depth.
+    """
+
+    SUBSCRIBED_EVENTS = frozenset({"event_end_game"})
+
+    """
+    :param depth: the depth of the search
+    :param workers: the number of worker processes (defaults to the number of cpus)
+    :param transposition_table_bytes: the memory cap of the transposition table of each worker (0 disables it)
+    """
+    def __init__(self, name, depth=6, workers=None, transposition_table_bytes=4 * 1024 * 1024):
+        super().__init__(name, depth, 0)
+        self.__workers = workers or os.cpu_count()
+        self.__transposition_table_bytes = transposition_table_bytes
+        self.__executor = None
+        self.__root_values = None
+        self.__game = 0
+
+        """
+        stats of the searches
+        """
+        self.__nodes = 0
+        self.__search_time = 0.0
+
+    def __get_executor(self, num_cols):
+        if self.__executor is None or len(self.__root_values) != num_cols:
+            self.close()
+            self.__root_values = RawArray('d', num_cols)
+            self.__executor = ProcessPoolExecutor(self.__workers, initializer=_init_worker,
+                                                  initargs=(self.__root_values, self.max_depth,
+                                                            self.__transposition_table_bytes))
+        return self.__executor
+
+    def get_action(self, state: Connect4State):
+        book_action = self.get_book_action(state)
+        if book_action is not None:
+            return book_action
+
+        state = state.clone()
+        executor = self.__get_executor(state.get_num_cols())
+        for col in range(len(self.__root_values)):
+            self.__root_values[col] = -inf
+
+        start = perf_counter()
+        # the moves are submitted from the center outwards, since they are usually the best ones
+        center = (state.get_num_cols() - 1) / 2
+        actions = sorted(state.get_possible_actions(), key=lambda action: abs(action.get_col() - center))
+        futures = [(action, executor.submit(_search_root_move, state, action.get_col(), self.max_depth,
+                                            self.get_current_pos(), self.__game)) for action in actions]
+
+        best_eval = -inf
+        best_action = None
+        for action, future in futures:
+            value, alpha, nodes = future.result()
+            self.__nodes += nodes
+            if value > alpha and (value > best_eval or (value == best_eval and action.get_col() < best_action.get_col())):
+                best_eval = value
+                best_action = action
+        self.__search_time += perf_counter() - start
+
+        return best_action
+
+    """
+    shuts down the worker processes (they are started again on the next move)
+    """
+    def close(self):
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        # the worker processes can't be pickled (e.g. when a simulator is returned by a worker process),
+        # the copy starts its own pool when it needs one
+        state = self.__dict__.copy()
+        state["_ParallelMinimaxConnect4Player__executor"] = None
+        state["_ParallelMinimaxConnect4Player__root_values"] = None
+        return state
+
+    def event_new_game(self):
+        # the workers clear their transposition tables when they see a new game
+        self.__game += 1
+
+    def print_stats(self):
+        if self.__search_time > 0:
+            print(f"{self.get_name()}: {self.__nodes} nodes searched at {self.__nodes / self.__search_time:.0f} nodes/s "
+                  f"with {self.__workers} workers")
+
+    def event_action(self, pos: int, action, new_state: State):
+        pass
+
+    def event_end_game(self, final_state: State):
+        # the workers are not kept alive between games, so no process outlives the tournament
+        self.close()
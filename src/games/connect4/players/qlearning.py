@@ -1,72 +1,224 @@
 import numpy as np
+from pathlib import Path
 from games.connect4.action import Connect4Action
 from games.connect4.player import Connect4Player
+from games.connect4.result import Connect4Result
 from games.connect4.state import Connect4State
+from games.connect4.value_function import LinearValueFunction
+from games.q_table import QTable
 from games.state import State
 import random
 
 class QLearningConnect4Player(Connect4Player):
-    def __init__(self, name, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1):
+
+    SUBSCRIBED_EVENTS = frozenset({"event_end_game"})
+
+    # Default location of the learned Q-table (see QTable)
+    DEFAULT_Q_TABLE_PATH = Path(__file__).parent.parent / 'q_table.bin'
+
+    def __init__(self, name, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1,
+                 q_table=DEFAULT_Q_TABLE_PATH, checkpoint_interval=None, function_approximation=False,
+                 batch_size=256, weights=None):
         super().__init__(name)
         self.learning_rate = learning_rate  # Q-learning rate
         self.discount_factor = discount_factor  # Discount factor for future rewards
         self.exploration_rate = exploration_rate  # Exploration rate (epsilon-greedy)
-        self.q_values = {}  # Dictionary to store Q-values for state-action pairs
+        self.q_values = {}  # Dictionary to store Q-values for state-action pairs (see get_state_action_key)
+        # Trace of the current episode: (state-action key of the move played, keys of all the possible moves)
+        self.episode = []
+        # Q-values learned in earlier runs, read from a memory-mapped file (None to start from scratch).
+        # q_values holds the values learned since the table was opened, which take precedence over it
+        self.q_table_path = q_table
+        self.q_table = QTable.open(q_table) if q_table is not None else None
+        # Number of games after which the learned values are written back to the table file, or to the weights
+        # file with function approximation (None: never). Each checkpoint replaces the whole file with this
+        # player's values, so only one process may checkpoint to a file: players of different tournament worker
+        # processes (--workers) would each overwrite the values learned by the others
+        self.checkpoint_interval = checkpoint_interval
+        self.num_actions = self.q_table.get_num_actions() if self.q_table is not None else None
+        self.num_learned_games = 0
+        # With function approximation, the Q-values come from a LinearValueFunction (created for the size of the
+        # first board played, or read from the weights file) instead of the table, and are learned in batches of
+        # batch_size moves
+        self.function_approximation = function_approximation
+        self.batch_size = batch_size
+        self.weights_path = weights
+        self.value_function = None
+        self.batch = []
+        if function_approximation:
+            self.q_table = None
+            if checkpoint_interval is not None and weights is None:
+                raise ValueError("Checkpoints with function approximation need a path for the weights")
 
     def get_action(self, state: Connect4State):
+        if self.num_actions != state.get_num_cols():
+            self.set_board_size(state.get_num_rows(), state.get_num_cols())
+        possible_actions = state.get_possible_actions()
+        if self.function_approximation:
+            return self.get_approximated_action(state.clone(), possible_actions)
+
+        keys = self.get_state_action_keys(state, possible_actions)
+
         if random.random() < self.exploration_rate:
             # Explore: choose a random action
-            return random.choice(state.get_possible_actions())
-
-        # Exploit: choose the action with the highest Q-value
-        best_action = None
-        best_q_value = -float('inf')
-        for action in state.get_possible_actions():
-            q_value = self.get_q_value(state, action)
-            if q_value > best_q_value:
-                best_q_value = q_value
-                best_action = action
-        
-        return best_action
+            index = random.randrange(len(possible_actions))
+        else:
+            # Exploit: choose the action with the highest Q-value
+            index = None
+            best_q_value = -float('inf')
+            for i, key in enumerate(keys):
+                q_value = self.get_stored_q_value(key)
+                if q_value > best_q_value:
+                    best_q_value = q_value
+                    index = i
+
+        self.episode.append((keys[index], keys))
+        return possible_actions[index]
+
+    def set_board_size(self, num_rows, num_cols):
+        # The board size is set by the first game played, or up front by a learner that never plays (e.g. the
+        # learner of train.py) so its values can be saved. The table packs the column into the key of each entry,
+        # so it can only be read for boards of its width, and its records only hold keys of up to
+        # QTable.MAX_KEY_BITS bits
+        if not self.function_approximation:
+            if self.q_table is not None and self.q_table.get_num_actions() != num_cols:
+                raise ValueError(f"The Q-table was learned on boards of {self.q_table.get_num_actions()} columns, "
+                                 f"not {num_cols}")
+            uses_file = self.q_table is not None or self.checkpoint_interval is not None
+            if uses_file and (num_rows + 1) * num_cols > QTable.MAX_KEY_BITS:
+                raise ValueError(f"The keys of a {num_rows}x{num_cols} board do not fit in a Q-table file")
+        self.num_actions = num_cols
+
+    def get_approximated_action(self, state, possible_actions):
+        # A single dot product gives the Q-values of all the moves; the trace keeps the features of every move
+        if self.value_function is None:
+            self.value_function = self.create_value_function(state.get_num_rows(), state.get_num_cols())
+        features = self.value_function.get_features(state, possible_actions)
+        if random.random() < self.exploration_rate:
+            index = random.randrange(len(possible_actions))
+        else:
+            index = int(np.argmax(self.value_function.evaluate(features)))
+        self.episode.append((index, features))
+        return possible_actions[index]
+
+    def create_value_function(self, num_rows, num_cols):
+        value_function = None
+        if self.weights_path is not None:
+            value_function = LinearValueFunction.load(self.weights_path, self.learning_rate)
+        if value_function is None:
+            return LinearValueFunction(num_rows, num_cols, self.learning_rate)
+        if (value_function.get_num_rows(), value_function.get_num_cols()) != (num_rows, num_cols):
+            raise ValueError(f"The weights were learned on a {value_function.get_num_rows()}x"
+                             f"{value_function.get_num_cols()} board, not {num_rows}x{num_cols}")
+        return value_function
 
     def get_q_value(self, state, action):
         # Retrieve Q-value for a state-action pair; initialize to zero if unseen
-        state_key = self.get_state_key(state)
-        return self.q_values.get((state_key, action), 0.0)
-
-    def update_q_value(self, state, action, reward, next_state):
-        # Update Q-value using the Q-learning update rule
-        state_key = self.get_state_key(state)
-        next_state_key = self.get_state_key(next_state)
-        current_q_value = self.get_q_value(state, action)
-        max_next_q_value = max([self.get_q_value(next_state, next_action) for next_action in next_state.get_possible_actions()])
+        return self.get_stored_q_value(self.get_state_action_key(state, action))
+
+    def get_stored_q_value(self, state_action_key):
+        # Values learned in this run come first, then the ones of the table file; unseen pairs are zero
+        q_value = self.q_values.get(state_action_key)
+        if q_value is None and self.q_table is not None:
+            q_value = self.q_table.lookup(state_action_key)
+        return q_value if q_value is not None else 0.0
+
+    def update_q_value(self, state_action_key, reward, next_state_action_keys):
+        # Update Q-value using the Q-learning update rule (there are no next actions after the last move)
+        current_q_value = self.get_stored_q_value(state_action_key)
+        max_next_q_value = max([self.get_stored_q_value(key) for key in next_state_action_keys], default=0.0)
         new_q_value = current_q_value + self.learning_rate * (reward + self.discount_factor * max_next_q_value - current_q_value)
-        self.q_values[(state_key, action)] = new_q_value
+        self.q_values[state_action_key] = new_q_value
 
     def get_state_key(self, state):
         # Generate a unique key for a Connect4State object (used for Q-value dictionary)
-        return str(state.get_grid())
+        # a position and its mirror image share the same key
+        state_key, _ = state.get_canonical_key()
+        return state_key
+
+    def get_state_action_key(self, state, action):
+        return self.get_state_action_keys(state, [action])[0]
+
+    def get_state_action_keys(self, state, actions):
+        # the actions are mapped to the column they take in the canonical position, so mirrored positions share
+        # their Q-values. The column is packed with the state key in a single integer; the canonical key is only
+        # computed once for all the actions of the state
+        state_key, mirrored = state.get_canonical_key()
+        num_cols = state.get_num_cols()
+        base = state_key * num_cols
+        if mirrored:
+            return [base + num_cols - 1 - action.get_col() for action in actions]
+        return [base + action.get_col() for action in actions]
+
+    def event_new_game(self):
+        self.episode = []
 
     def event_end_game(self, final_state: Connect4State):
         # Update Q-values based on game outcome (reward)
         winner = final_state.get_result(self.get_current_pos())
-        reward = 1.0 if winner == 1 else -1.0  # Reward: +1 for winning, -1 for losing
+        reward = 1.0 if winner == Connect4Result.WIN.value else -1.0  # Reward: +1 for winning, -1 for losing
         self.update_q_values(reward)
 
+        self.num_learned_games += 1
+        if self.checkpoint_interval is not None and self.num_learned_games % self.checkpoint_interval == 0:
+            if self.function_approximation:
+                self.save_weights()
+            else:
+                self.save_q_table()
+
+    def update_value_function(self, reward):
+        # Same targets as the table updates (the reward for the last move, then the discounted best Q-value of the
+        # next move), queued until there are enough moves for a batched update of the value function
+        target = reward
+        for index, features in reversed(self.episode):
+            self.batch.append((features[index], target))
+            target = self.discount_factor * float(np.max(self.value_function.evaluate(features)))
+        self.episode = []
+
+        if len(self.batch) >= self.batch_size:
+            features, targets = zip(*self.batch)
+            self.value_function.update(np.array(features), np.array(targets))
+            self.batch = []
+
+    def save_weights(self, path=None):
+        # Write the weights of the value function (function approximation only)
+        if not self.function_approximation:
+            raise ValueError("The player has no value function, its Q-values are saved with save_q_table")
+        path = path if path is not None else self.weights_path
+        if self.value_function is None:
+            return
+        self.value_function.save(path)
+        self.weights_path = path
+
+    def save_q_table(self, path=None):
+        # Write the table file merged with the values learned since it was opened, then read from the new file,
+        # so the values kept in memory never grow beyond the ones learned between two checkpoints
+        if self.function_approximation:
+            raise ValueError("The player learns a value function, its weights are saved with save_weights")
+        path = path if path is not None else self.q_table_path
+        if self.num_actions is None:
+            return
+        if self.q_table is not None and self.q_table.get_num_actions() != self.num_actions:
+            raise ValueError(f"The Q-table has {self.q_table.get_num_actions()} actions, not {self.num_actions}")
+        QTable.save(path, self.num_actions, QTable.merge(self.q_table, self.q_values))
+        self.q_table_path = path
+        self.q_table = QTable.open(path)
+        self.q_values = {}
+
     def update_q_values(self, reward):
-        # Update Q-values for all state-action pairs encountered in the current game
-        visited_states = set()
-        for (state_action_key, _), q_value in self.q_values.items():
-            state_key, action = state_action_key
-            if state_key not in visited_states:
-                visited_states.add(state_key)
-                q_value += self.learning_rate * (reward - q_value)
-                self.q_values[(state_key, action)] = q_value
+        if self.function_approximation:
+            self.update_value_function(reward)
+            return
 
-    def event_action(self, pos: int, action, new_state: State):
-        # Implement if needed
-        pass
+        # Update only the moves of the current episode, from the last one backwards: the reward is given to the
+        # last move, and each earlier move learns from the (already updated) Q-values of the move after it
+        next_state_action_keys = []
+        for state_action_key, possible_keys in reversed(self.episode):
+            self.update_q_value(state_action_key, reward, next_state_action_keys)
+            reward = 0.0
+            next_state_action_keys = possible_keys
+        self.episode = []
 
-    def event_end_game(self, final_state: State):
+    def event_action(self, pos: int, action, new_state: State):
         # Implement if needed
         pass
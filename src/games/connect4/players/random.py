@@ -8,6 +8,8 @@ from games.state import State
 
 class RandomConnect4Player(Connect4Player):
 
+    SUBSCRIBED_EVENTS = frozenset()
+
     def __init__(self, name):
         super().__init__(name)
 
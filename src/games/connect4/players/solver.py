@@ -0,0 +1,62 @@
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.solver import Connect4Solver
+from games.connect4.state import Connect4State
+
+
+class SolverConnect4Player(MinimaxConnect4Player):
+    """
+    Minimax player that switches to the proof-number solver once the board is nearly full.
+    When the outcome of every move is proved, it plays the first move (from the left) with the best outcome.
+    If some move can not be proved within the node budget (or every move loses), it falls back to minimax.
+    """
+
+    """
+    :param depth: the depth of the minimax search
+    :param max_empty_cells: the solver is used when there are at most this number of empty cells
+    :param max_nodes: the node budget of each proof of the solver
+    """
+    def __init__(self, name, depth=4, max_empty_cells=16, max_nodes=20000):
+        super().__init__(name, depth)
+        self.max_empty_cells = max_empty_cells
+        self.solver = Connect4Solver(max_nodes)
+
+        """
+        stats: number of moves decided by the solver
+        """
+        self.__num_solved_moves = 0
+
+    def get_action(self, state: Connect4State):
+        num_empty_cells = state.get_num_rows() * state.get_num_cols() - bin(state.get_mask()).count('1')
+        if num_empty_cells <= self.max_empty_cells:
+            action = self.get_solved_action(state.clone())
+            if action is not None:
+                self.__num_solved_moves += 1
+                return action
+        return super().get_action(state)
+
+    """
+    retrieves the move with the best proved outcome, or None if it is unknown or every move loses
+    """
+    def get_solved_action(self, state: Connect4State):
+        best_action = None
+        best_outcome = None
+        for action in state.get_possible_actions():
+            state.apply(action)
+            outcome = self.solver.solve(state)
+            state.undo()
+            if outcome is None:
+                return None
+
+            # the outcome of the opponent, who acts after the move
+            outcome = -outcome
+            if outcome == Connect4Solver.WIN:
+                return action
+            if best_outcome is None or outcome > best_outcome:
+                best_outcome = outcome
+                best_action = action
+
+        return best_action if best_outcome != Connect4Solver.LOSS else None
+
+    def print_stats(self):
+        if self.__num_solved_moves > 0:
+            print(f"{self.get_name()}: {self.__num_solved_moves} moves decided by the solver")
@@ -1,4 +1,5 @@
 from games.connect4.action import Connect4Action
+from games.connect4.bitboard_state import BitboardConnect4State
 from games.connect4.player import Connect4Player
 from games.connect4.state import Connect4State
 from games.game_simulator import GameSimulator
@@ -6,8 +7,8 @@ from games.game_simulator import GameSimulator
 
 class Connect4Simulator(GameSimulator):
 
-    def __init__(self, players, num_rows: int = 6, num_cols: int = 7):
-        super(Connect4Simulator, self).__init__(players)
+    def __init__(self, players, num_rows: int = 6, num_cols: int = 7, **kwargs):
+        super(Connect4Simulator, self).__init__(players, **kwargs)
         """
         the number of rows and cols from the connect4 grid
         """
@@ -15,7 +16,11 @@ class Connect4Simulator(GameSimulator):
         self.__num_cols = num_cols
 
     def on_init_game(self):
-        return Connect4State(self.__num_rows, self.__num_cols)
+        return self.get_state_type()(self.__num_rows, self.__num_cols)
+
+    def get_initial_state_key(self):
+        # every game starts from the empty grid
+        return self.__num_rows, self.__num_cols
 
     def on_before_end_game(self, state: Connect4State):
         # ignored for this simulator
@@ -39,4 +44,14 @@ class Connect4Simulator(GameSimulator):
 
     @staticmethod
     def get_action_type():
-        return Connect4Action
\ No newline at end of file
+        return Connect4Action
+
+
+class BitboardConnect4Simulator(Connect4Simulator):
+    """
+    Same as the Connect4Simulator, but the games are played on a BitboardConnect4State
+    """
+
+    @staticmethod
+    def get_state_type():
+        return BitboardConnect4State
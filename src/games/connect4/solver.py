@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from math import inf
+
+from games.connect4.result import Connect4Result
+from games.connect4.state import Connect4State
+
+
+class Connect4Solver:
+    """
+    Proves the outcome of a Connect4 position (win, draw or loss for the acting player) with proof-number search.
+
+    The search runs over bitboards (see Connect4State.get_board), with the usual Connect4 shortcuts when a node
+    is expanded: a player that can complete a line wins, a player that must block two threats of the opponent
+    loses, a single threat of the opponent must be blocked, and the moves right below a threat of the opponent
+    are never played. Each outcome is proved with a budget of expanded nodes; when the budget runs out the
+    outcome is unknown.
+    The search always runs on the canonical orientation of the position (see Connect4State.get_canonical_key), so
+    whether an outcome is proved only depends on the position and the node budget.
+    The proved outcomes are cached by canonical key and node budget, and shared by all the solvers of the process,
+    so an endgame that is reached again (in the same game or in another game of the tournament) is answered
+    instantly. The cache keeps the most recently used MAX_CACHED_OUTCOMES outcomes; since a cached outcome is the
+    one the search would prove again, the cache never changes the answers, only how fast they come.
+    """
+
+    """
+    outcomes, for the acting player
+    """
+    WIN = 1
+    DRAW = 0
+    LOSS = -1
+
+    """
+    the maximum number of outcomes kept in the cache
+    """
+    MAX_CACHED_OUTCOMES = 100000
+
+    """
+    the outcomes proved so far, by (num_rows, num_cols, canonical key, max_nodes), the least recently used first
+    """
+    __outcomes = OrderedDict()
+
+    """
+    :param max_nodes: the maximum number of nodes expanded by each proof
+    """
+    def __init__(self, max_nodes: int = 100000):
+        self.max_nodes = max_nodes
+
+    @staticmethod
+    def clear_cache():
+        Connect4Solver.__outcomes.clear()
+
+    """
+    retrieves the outcome of a position for its acting player (WIN, DRAW or LOSS), or None if it could not be
+    proved within the node budget
+    """
+    def solve(self, state: Connect4State):
+        if state.is_finished():
+            result = state.get_result(state.get_acting_player())
+            return {Connect4Result.WIN.value: Connect4Solver.WIN, Connect4Result.DRAW.value: Connect4Solver.DRAW,
+                    Connect4Result.LOOSE.value: Connect4Solver.LOSS}[result]
+
+        num_rows, num_cols = state.get_num_rows(), state.get_num_cols()
+        key, mirrored = state.get_canonical_key()
+        cache_key = (num_rows, num_cols, key, self.max_nodes)
+        outcome = Connect4Solver.__outcomes.get(cache_key)
+        if outcome is not None:
+            Connect4Solver.__outcomes.move_to_end(cache_key)
+            return outcome
+
+        current, mask = state.get_board(state.get_acting_player()), state.get_mask()
+        if mirrored:
+            current = Connect4State.mirror_position_key(current, num_rows, num_cols)
+            mask = Connect4State.mirror_position_key(mask, num_rows, num_cols)
+        search = _ProofNumberSearch(num_rows, num_cols, current, mask)
+        # first prove if the acting player wins, and if not, if it can at least draw
+        is_win = search.prove(Connect4Solver.WIN, self.max_nodes)
+        if is_win is None:
+            return None
+        if is_win:
+            outcome = Connect4Solver.WIN
+        else:
+            is_draw = search.prove(Connect4Solver.DRAW, self.max_nodes)
+            if is_draw is None:
+                return None
+            outcome = Connect4Solver.DRAW if is_draw else Connect4Solver.LOSS
+
+        Connect4Solver.__outcomes[cache_key] = outcome
+        if len(Connect4Solver.__outcomes) > Connect4Solver.MAX_CACHED_OUTCOMES:
+            Connect4Solver.__outcomes.popitem(last=False)
+        return outcome
+
+
+class _ProofNumberSearch:
+    """
+    Proof-number search of a position, given as the bitboard of the acting player and the mask of all checkers.
+    A node of the tree is a list [proof, disproof, children, parent, current, mask, is_or, possible]: current holds
+    the checkers of the player to move in the node, is_or tells if that player is the acting player of the root, and
+    possible holds the moves worth playing in the node (see __analyze), kept for when the node is expanded.
+    """
+    __PROOF, __DISPROOF, __CHILDREN, __PARENT, __CURRENT, __MASK, __IS_OR, __POSSIBLE = range(8)
+
+    def __init__(self, num_rows: int, num_cols: int, current: int, mask: int):
+        self.__height = num_rows + 1
+        self.__num_cols = num_cols
+        self.__bottom = 0
+        for col in range(0, num_cols):
+            self.__bottom |= 1 << (col * self.__height)
+        self.__board_mask = self.__bottom * ((1 << num_rows) - 1)
+        self.__column_masks = [((1 << num_rows) - 1) << (col * self.__height) for col in range(0, num_cols)]
+        # the center columns are expanded first
+        center = (num_cols - 1) / 2
+        self.__column_order = sorted(range(0, num_cols), key=lambda col: abs(col - center))
+        self.__current = current
+        self.__mask = mask
+
+    def __winning_cells(self, position: int, mask: int) -> int:
+        # the empty cells that complete a line of 4 of the checkers in position
+        height = self.__height
+        cells = (position << 1) & (position << 2) & (position << 3)
+        for shift in (height, height - 1, height + 1):
+            pair = (position << shift) & (position << 2 * shift)
+            cells |= pair & (position << 3 * shift)
+            cells |= pair & (position >> shift)
+            pair = (position >> shift) & (position >> 2 * shift)
+            cells |= pair & (position << shift)
+            cells |= pair & (position >> 3 * shift)
+        return cells & (self.__board_mask ^ mask)
+
+    """
+    the outcome of a node for the player to move, if it is known without expanding it, and the playable moves
+    """
+    def __analyze(self, current: int, mask: int):
+        possible = (mask + self.__bottom) & self.__board_mask
+        if possible == 0:
+            return Connect4Solver.DRAW, 0
+        if self.__winning_cells(current, mask) & possible:
+            return Connect4Solver.WIN, 0
+
+        opponent_wins = self.__winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # two threats can not be blocked at once
+                return Connect4Solver.LOSS, 0
+            possible = forced
+
+        # playing below a threat of the opponent lets it complete the line
+        possible &= ~(opponent_wins >> 1)
+        if possible == 0:
+            return Connect4Solver.LOSS, 0
+        return None, possible
+
+    def __new_node(self, parent, current: int, mask: int, is_or: bool, target: int):
+        outcome, possible = self.__analyze(current, mask)
+        node = [1, 1, None, parent, current, mask, is_or, possible]
+        if outcome is not None:
+            # the outcome for the acting player of the root
+            if (outcome if is_or else -outcome) >= target:
+                node[_ProofNumberSearch.__PROOF], node[_ProofNumberSearch.__DISPROOF] = 0, inf
+            else:
+                node[_ProofNumberSearch.__PROOF], node[_ProofNumberSearch.__DISPROOF] = inf, 0
+        return node
+
+    def __expand(self, node, target: int):
+        current, mask = node[_ProofNumberSearch.__CURRENT], node[_ProofNumberSearch.__MASK]
+        possible = node[_ProofNumberSearch.__POSSIBLE]
+        children = []
+        for col in self.__column_order:
+            move = possible & self.__column_masks[col]
+            if move:
+                children.append(self.__new_node(node, current ^ mask, mask | move, not node[_ProofNumberSearch.__IS_OR],
+                                                target))
+        node[_ProofNumberSearch.__CHILDREN] = children
+
+    @staticmethod
+    def __update_numbers(node):
+        children = node[_ProofNumberSearch.__CHILDREN]
+        if node[_ProofNumberSearch.__IS_OR]:
+            node[_ProofNumberSearch.__PROOF] = min(child[_ProofNumberSearch.__PROOF] for child in children)
+            node[_ProofNumberSearch.__DISPROOF] = sum(child[_ProofNumberSearch.__DISPROOF] for child in children)
+        else:
+            node[_ProofNumberSearch.__PROOF] = sum(child[_ProofNumberSearch.__PROOF] for child in children)
+            node[_ProofNumberSearch.__DISPROOF] = min(child[_ProofNumberSearch.__DISPROOF] for child in children)
+
+    """
+    proves if the acting player of the root gets at least target (WIN or DRAW)
+    :return: True if proved, False if disproved, None if the node budget ran out
+    """
+    def prove(self, target: int, max_nodes: int):
+        proof, disproof, children = _ProofNumberSearch.__PROOF, _ProofNumberSearch.__DISPROOF, _ProofNumberSearch.__CHILDREN
+        root = self.__new_node(None, self.__current, self.__mask, True, target)
+
+        num_nodes = 0
+        while root[proof] != 0 and root[disproof] != 0 and num_nodes < max_nodes:
+            # descend to the most proving node
+            node = root
+            while node[children] is not None:
+                if node[_ProofNumberSearch.__IS_OR]:
+                    node = next(child for child in node[children] if child[proof] == node[proof])
+                else:
+                    node = next(child for child in node[children] if child[disproof] == node[disproof])
+
+            self.__expand(node, target)
+            num_nodes += 1
+
+            # update the numbers of the ancestors, until they do not change
+            while node is not None:
+                old_numbers = node[proof], node[disproof]
+                _ProofNumberSearch.__update_numbers(node)
+                if (node[proof], node[disproof]) == old_numbers:
+                    break
+                node = node[_ProofNumberSearch.__PARENT]
+
+        if root[proof] == 0:
+            return True
+        if root[disproof] == 0:
+            return False
+        return None
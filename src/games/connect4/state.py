@@ -1,15 +1,27 @@
+import random
 from typing import Optional
 
 from termcolor import colored
 
 from games.connect4.action import Connect4Action
 from games.connect4.result import Connect4Result
+from games.connect4.windows import WindowCounts
 from games.state import State
 
 
 class Connect4State(State):
     EMPTY_CELL = -1
 
+    """
+    the zobrist keys of each board size, shared by all the states (see get_zobrist_keys)
+    """
+    __zobrist_keys = {}
+
+    """
+    the bit at the bottom of each column, for each board size (see build_position_key)
+    """
+    __bottom_masks = {}
+
     def __init__(self, num_rows: int = 6, num_cols: int = 7):
         super().__init__()
 
@@ -44,48 +56,119 @@ class Connect4State(State):
         """
         self.__has_winner = False
 
-    def __check_winner(self, player):
-        # check for 4 across
-        for row in range(0, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row][col + 1] == player and \
-                        self.__grid[row][col + 2] == player and \
-                        self.__grid[row][col + 3] == player:
-                    return True
-
-        # check for 4 up and down
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col] == player and \
-                        self.__grid[row + 2][col] == player and \
-                        self.__grid[row + 3][col] == player:
-                    return True
-
-        # check upward diagonal
-        for row in range(3, self.__num_rows):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row - 1][col + 1] == player and \
-                        self.__grid[row - 2][col + 2] == player and \
-                        self.__grid[row - 3][col + 3] == player:
-                    return True
-
-        # check downward diagonal
-        for row in range(0, self.__num_rows - 3):
-            for col in range(0, self.__num_cols - 3):
-                if self.__grid[row][col] == player and \
-                        self.__grid[row + 1][col + 1] == player and \
-                        self.__grid[row + 2][col + 2] == player and \
-                        self.__grid[row + 3][col + 3] == player:
-                    return True
+        """
+        the moves performed with apply, as (col, had_winner), so they can be reverted with undo
+        """
+        self.__applied_moves = []
 
+        """
+        the zobrist keys of this board size, and the zobrist hash of the current position
+        """
+        self.__zobrist = Connect4State.get_zobrist_keys(num_rows, num_cols)
+        self.__hash = 0
+
+        """
+        the checkers of each player as bitboards (same layout as BitboardConnect4State), used to build position keys
+        """
+        self.__boards = [0, 0]
+
+        """
+        the bitboards of the mirrored position (left to right), so the canonical key is available on every move
+        """
+        self.__mirrored_boards = [0, 0]
+
+        """
+        the checkers of each player in every window of 4 cells, used to evaluate positions, updated on each move
+        """
+        self.__windows = WindowCounts(num_rows, num_cols)
+
+    """
+    Retrieves the zobrist keys for a board size: a random 64-bit key for each player and cell, indexed as
+    [player][row][col]. The hash of a position is the XOR of the keys of its checkers, so it can be updated
+    incrementally on every move. The keys are generated from a fixed seed, so hashes are the same in every process
+    """
+    @staticmethod
+    def get_zobrist_keys(num_rows: int, num_cols: int):
+        keys = Connect4State.__zobrist_keys.get((num_rows, num_cols))
+        if keys is None:
+            generator = random.Random(f"connect4-zobrist-{num_rows}x{num_cols}")
+            keys = [[[generator.getrandbits(64) for _col in range(num_cols)] for _row in range(num_rows)]
+                    for _player in range(2)]
+            Connect4State.__zobrist_keys[(num_rows, num_cols)] = keys
+        return keys
+
+    """
+    Builds the unique key of a position from the bitboards of its checkers: each column takes num_rows + 1 bits, and
+    the bit of the cell at height h of column c is c * (num_rows + 1) + h. The key is the checkers of the acting player
+    plus the mask of all the checkers plus a bit at the bottom of each column: adding the bottom bits turns the mask
+    into a bit just above the top checker of each column, so the key identifies the position without collisions
+    """
+    @staticmethod
+    def build_position_key(acting_board: int, mask: int, num_rows: int, num_cols: int) -> int:
+        bottom = Connect4State.__bottom_masks.get((num_rows, num_cols))
+        if bottom is None:
+            bottom = 0
+            for col in range(0, num_cols):
+                bottom |= 1 << (col * (num_rows + 1))
+            Connect4State.__bottom_masks[(num_rows, num_cols)] = bottom
+        return acting_board + mask + bottom
+
+    """
+    mirrors a position key left to right (each column of num_rows + 1 bits is moved to the opposite column)
+    """
+    @staticmethod
+    def mirror_position_key(key: int, num_rows: int, num_cols: int) -> int:
+        height = num_rows + 1
+        column_mask = (1 << height) - 1
+        mirrored = 0
+        for col in range(0, num_cols):
+            mirrored |= ((key >> (col * height)) & column_mask) << ((num_cols - 1 - col) * height)
+        return mirrored
+
+    """
+    the directions of the lines that go through a cell (horizontal, vertical and both diagonals)
+    """
+    __DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    """
+    checks if the checker placed in a cell completes a line of 4. Only the lines through the last placed
+    checker can change after a move, so there is no need to scan the whole grid
+    """
+    def __check_winner(self, row, col):
+        player = self.__grid[row][col]
+        for d_row, d_col in Connect4State.__DIRECTIONS:
+            count = 1
+            # walk up to 3 cells in both senses of the direction
+            for sense in (1, -1):
+                r, c = row + sense * d_row, col + sense * d_col
+                for _ in range(3):
+                    if not (0 <= r < self.__num_rows and 0 <= c < self.__num_cols) or self.__grid[r][c] != player:
+                        break
+                    count += 1
+                    r += sense * d_row
+                    c += sense * d_col
+            if count >= 4:
+                return True
         return False
 
     def get_grid(self):
         return self.__grid
 
+    """
+    the player of the checker in a cell, or EMPTY_CELL. Unlike get_grid, it is not copied when read through a StateView
+    """
+    def get_cell(self, row: int, col: int) -> int:
+        return self.__grid[row][col]
+
+    """
+    the checkers of a player as a bitboard (same layout as BitboardConnect4State)
+    """
+    def get_board(self, player: int) -> int:
+        return self.__boards[player]
+
+    def get_mask(self) -> int:
+        return self.__boards[0] | self.__boards[1]
+
     def get_num_players(self):
         return 2
 
@@ -111,14 +194,44 @@ class Connect4State(State):
                 self.__grid[row][col] = self.__acting_player
                 break
 
-        # determine if there is a winner
-        self.__has_winner = self.__check_winner(self.__acting_player)
+        self.__hash ^= self.__zobrist[self.__acting_player][row][col]
+        self.__boards[self.__acting_player] |= 1 << (col * (self.__num_rows + 1) + self.__num_rows - 1 - row)
+        self.__mirrored_boards[self.__acting_player] |= \
+            1 << ((self.__num_cols - 1 - col) * (self.__num_rows + 1) + self.__num_rows - 1 - row)
+        self.__windows.add(row, col, self.__acting_player)
+
+        # determine if there is a winner (only the lines through the new checker need to be checked)
+        self.__has_winner = self.__check_winner(row, col)
 
         # switch to next player
         self.__acting_player = 1 if self.__acting_player == 0 else 0
 
         self.__turns_count += 1
 
+    def apply(self, action: Connect4Action):
+        self.__applied_moves.append((action.get_col(), self.__has_winner))
+        self.update(action)
+
+    def undo(self):
+        col, had_winner = self.__applied_moves.pop()
+
+        # remove the top checker of the column
+        row = 0
+        while self.__grid[row][col] == Connect4State.EMPTY_CELL:
+            row += 1
+        self.__hash ^= self.__zobrist[self.__grid[row][col]][row][col]
+        self.__boards[self.__grid[row][col]] &= ~(1 << (col * (self.__num_rows + 1) + self.__num_rows - 1 - row))
+        self.__mirrored_boards[self.__grid[row][col]] &= \
+            ~(1 << ((self.__num_cols - 1 - col) * (self.__num_rows + 1) + self.__num_rows - 1 - row))
+        self.__windows.remove(row, col, self.__grid[row][col])
+        self.__grid[row][col] = Connect4State.EMPTY_CELL
+
+        # switch back to the previous player
+        self.__acting_player = 1 if self.__acting_player == 0 else 0
+
+        self.__turns_count -= 1
+        self.__has_winner = had_winner
+
     def __display_cell(self, row, col):
         cell_value = self.__grid[row][col]
         if cell_value == 0:
@@ -172,6 +285,10 @@ class Connect4State(State):
         cloned_state.__turns_count = self.__turns_count
         cloned_state.__acting_player = self.__acting_player
         cloned_state.__has_winner = self.__has_winner
+        cloned_state.__hash = self.__hash
+        cloned_state.__boards = self.__boards.copy()
+        cloned_state.__mirrored_boards = self.__mirrored_boards.copy()
+        cloned_state.__windows = self.__windows.copy()
         for row in range(0, self.__num_rows):
             for col in range(0, self.__num_cols):
                 cloned_state.__grid[row][col] = self.__grid[row][col]
@@ -184,6 +301,45 @@ class Connect4State(State):
             return Connect4Result.DRAW.value
         return None
 
+    """
+    the zobrist hash of the current position
+    """
+    def get_hash(self) -> int:
+        return self.__hash
+
+    """
+    the unique key of the current position (see build_position_key)
+    """
+    def get_position_key(self) -> int:
+        return Connect4State.build_position_key(self.__boards[self.__acting_player],
+                                                self.__boards[0] | self.__boards[1], self.__num_rows, self.__num_cols)
+
+    """
+    The canonical key of the current position: the minimum of the position key and the key of the mirrored
+    position, so a position and its mirror image share the same key. Returns (key, mirrored), where mirrored tells
+    if the key is the one of the mirrored position: in that case, column c of the canonical position is column
+    num_cols - 1 - c of this one
+    """
+    def get_canonical_key(self):
+        key = self.get_position_key()
+        mirrored_key = Connect4State.build_position_key(self.__mirrored_boards[self.__acting_player],
+                                                        self.__mirrored_boards[0] | self.__mirrored_boards[1],
+                                                        self.__num_rows, self.__num_cols)
+        return (mirrored_key, True) if mirrored_key < key else (key, False)
+
+    """
+    the number of open windows of 4 cells (with no checkers of the opponent) with a number of checkers of a player
+    :param direction: only count the windows of a direction (see WindowCounts)
+    """
+    def get_num_open_windows(self, player: int, num_checkers: int, direction: int = None) -> int:
+        return self.__windows.get_num_open(player, num_checkers, direction)
+
+    """
+    the number of checkers of a player in each window of 4 cells (see WindowCounts.get_occupancy)
+    """
+    def get_window_occupancy(self, player: int):
+        return self.__windows.get_occupancy(player)
+
     def get_num_rows(self):
         return self.__num_rows
 
@@ -0,0 +1,98 @@
+from array import array
+
+
+class TranspositionTable:
+    """
+    A bounded transposition table for the Connect4 search, indexed by the zobrist hash of the positions.
+
+    The table is split in buckets of two slots:
+        - the depth-preferred slot only gets replaced by a search of the same or a greater depth (a shallower
+          search of the position it holds is dropped)
+        - the always-replace slot keeps the most recent entry that did not fit in the depth-preferred slot
+    The entries are stored in typed arrays, so the memory used by the table is fixed when it is created
+    and is bounded by max_bytes. Clearing the table only starts a new generation: entries of older generations
+    are treated as empty slots, so the arrays only need to be reset once every 256 generations.
+    """
+
+    """
+    the kind of value stored in an entry
+    """
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    """
+    bytes used by an entry: key (8), value (8), depth (1), flag (1), best move (1), generation (1)
+    """
+    ENTRY_BYTES = 20
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        self.__num_buckets = max(1, max_bytes // (2 * TranspositionTable.ENTRY_BYTES))
+        self.__generation = 0
+        self.__reset()
+
+    def __reset(self):
+        num_slots = 2 * self.__num_buckets
+        self.__keys = array('Q', [0]) * num_slots
+        self.__values = array('d', [0.0]) * num_slots
+        self.__depths = array('b', [0]) * num_slots
+        self.__flags = array('B', [0]) * num_slots
+        self.__moves = array('b', [-1]) * num_slots
+        # generation 0 is never used, so every slot starts empty
+        self.__generations = array('B', [0]) * num_slots
+        self.__generation = 1
+
+    """
+    removes all the entries of the table
+    """
+    def clear(self):
+        if self.__generation == 255:
+            self.__reset()
+        else:
+            self.__generation += 1
+
+    def __is_empty(self, index):
+        return self.__generations[index] != self.__generation
+
+    """
+    the number of entries the table can hold
+    """
+    def get_capacity(self):
+        return 2 * self.__num_buckets
+
+    """
+    retrieves the entry of a position as a tuple (depth, value, flag, best move), or None if there is no entry
+    :param key: the zobrist hash of the position
+    """
+    def lookup(self, key: int):
+        slot = (key % self.__num_buckets) * 2
+        for index in (slot, slot + 1):
+            if not self.__is_empty(index) and self.__keys[index] == key:
+                move = self.__moves[index]
+                return self.__depths[index], self.__values[index], self.__flags[index], move if move >= 0 else None
+        return None
+
+    """
+    stores the result of the search of a position
+    :param key: the zobrist hash of the position
+    :param depth: the remaining depth of the search
+    :param value: the value found for the position
+    :param flag: EXACT, LOWER_BOUND or UPPER_BOUND
+    :param move: the best move found (column), or None
+    """
+    def store(self, key: int, depth: int, value, flag: int, move=None):
+        slot = (key % self.__num_buckets) * 2
+        if self.__is_empty(slot) or depth >= self.__depths[slot]:
+            index = slot
+        elif self.__keys[slot] == key:
+            # a deeper search of the same position (in this generation) is worth more than this one
+            return
+        else:
+            index = slot + 1
+
+        self.__keys[index] = key
+        self.__values[index] = value
+        self.__depths[index] = min(depth, 127)
+        self.__flags[index] = flag
+        self.__moves[index] = move if move is not None else -1
+        self.__generations[index] = self.__generation
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+
+from games.connect4.state import Connect4State
+from games.connect4.windows import WindowCounts
+
+
+class LinearValueFunction:
+    """
+    A linear approximation of the Q-values of Connect4, for learners whose table of Q-values would grow without
+    bound. The value of a move is the dot product of a fixed set of weights with the features of the position
+    it leads to, seen by the player that makes it:
+    - for each window of 4 cells (see WindowCounts), one feature for each number of checkers (1 to 4) of the player
+      in the window while it is open for the player, and the same for the opponent
+    - for each column, one feature for each height of its checkers
+    - a bias
+    The memory used is the same whatever the number of games learned.
+    """
+
+    def __init__(self, num_rows: int, num_cols: int, learning_rate: float = 0.1):
+        self.learning_rate = learning_rate
+        self.__num_rows = num_rows
+        self.__num_cols = num_cols
+        self.__num_windows = WindowCounts(num_rows, num_cols).get_num_windows()
+        self.__heights_offset = 8 * self.__num_windows
+        self.__num_features = self.__heights_offset + num_cols * (num_rows + 1) + 1
+        self.__window_offsets = 4 * np.arange(0, self.__num_windows)
+        self.weights = np.zeros(self.__num_features)
+
+    """
+    reads the weights written by save, or returns None if there is no file at path
+    """
+    @staticmethod
+    def load(path, learning_rate: float = 0.1):
+        if not os.path.isfile(path):
+            return None
+        with np.load(path) as data:
+            value_function = LinearValueFunction(int(data['num_rows']), int(data['num_cols']), learning_rate)
+            if data['weights'].shape != value_function.weights.shape:
+                raise ValueError(f"'{path}' does not hold the weights of a {value_function.__num_rows}x"
+                                 f"{value_function.__num_cols} board")
+            value_function.weights = data['weights'].copy()
+        return value_function
+
+    """
+    writes the weights (and the board size), replacing the file at path
+    """
+    def save(self, path):
+        path = os.path.abspath(path)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, weights=self.weights, num_rows=self.__num_rows, num_cols=self.__num_cols)
+        os.replace(temporary_path, path)
+
+    def get_num_rows(self) -> int:
+        return self.__num_rows
+
+    def get_num_cols(self) -> int:
+        return self.__num_cols
+
+    def get_num_features(self) -> int:
+        return self.__num_features
+
+    """
+    the features of the positions reached by each of a list of moves of the acting player
+    :return: a matrix with a row of features for each move
+    """
+    def get_features(self, state: Connect4State, actions):
+        player = state.get_acting_player()
+        features = np.zeros((len(actions), self.__num_features))
+        features[:, -1] = 1.0
+
+        height = self.__num_rows + 1
+        column = (1 << self.__num_rows) - 1
+        mask = state.get_mask()
+        heights = np.array([bin((mask >> (col * height)) & column).count('1') for col in range(0, self.__num_cols)])
+        col_offsets = self.__heights_offset + height * np.arange(0, self.__num_cols)
+
+        for i, action in enumerate(actions):
+            state.apply(action)
+            own = np.array(state.get_window_occupancy(player))
+            other = np.array(state.get_window_occupancy(1 - player))
+            state.undo()
+
+            open_own = (other == 0) & (own > 0)
+            features[i, self.__window_offsets[open_own] + own[open_own] - 1] = 1.0
+            open_other = (own == 0) & (other > 0)
+            features[i, 4 * self.__num_windows + self.__window_offsets[open_other] + other[open_other] - 1] = 1.0
+
+            features[i, col_offsets + heights] = 1.0
+            # the checker of the move is on top of its column
+            col = action.get_col()
+            features[i, col_offsets[col] + heights[col]] = 0.0
+            features[i, col_offsets[col] + heights[col] + 1] = 1.0
+        return features
+
+    """
+    the values of the rows of a matrix of features
+    """
+    def evaluate(self, features):
+        return features @ self.weights
+
+    """
+    moves the values of a batch of features towards their targets, with the step of each row normalized by its
+    number of active features (so the step does not depend on how many windows are open)
+    """
+    def update(self, features, targets):
+        errors = targets - features @ self.weights
+        errors /= np.einsum('ij,ij->i', features, features)
+        self.weights += self.learning_rate * (features.T @ errors)
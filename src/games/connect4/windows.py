@@ -0,0 +1,136 @@
+class WindowCounts:
+    """
+    Keeps, for every window of 4 cells of the board (every line where a player can connect 4), the number of
+    checkers of each player in it. It also keeps the number of open windows of each player by direction and
+    number of checkers: a window is open for a player when the opponent has no checkers in it.
+    Adding or removing a checker only updates the windows through its cell, so the counts of open windows
+    (e.g. the number of open 3s of a player) are always available without scanning the board.
+    """
+
+    """
+    the directions of the windows, as indexes of DIRECTIONS
+    """
+    HORIZONTAL = 0
+    VERTICAL = 1
+    DIAGONAL = 2
+    ANTI_DIAGONAL = 3
+
+    """
+    the (row, col) step of each direction
+    """
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    """
+    the windows of each board size, shared by all the counts (see __get_layout)
+    """
+    __layouts = {}
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.__cell_windows, windows_by_direction = WindowCounts.__get_layout(num_rows, num_cols)
+
+        """
+        the number of checkers of each player in each window
+        """
+        num_windows = sum(windows_by_direction)
+        self.__occupancy = [[0] * num_windows, [0] * num_windows]
+
+        """
+        the number of open windows of each player, by direction and number of checkers (0 to 4), stored flat at
+        the index 5 * direction + number of checkers
+        """
+        self.__open = [[count for num_windows in windows_by_direction for count in (num_windows, 0, 0, 0, 0)]
+                       for _player in range(2)]
+
+    """
+    enumerates the windows of a board size: the windows through each cell, as (window, 5 * direction), and the
+    number of windows of each direction
+    """
+    @staticmethod
+    def __get_layout(num_rows: int, num_cols: int):
+        layout = WindowCounts.__layouts.get((num_rows, num_cols))
+        if layout is None:
+            num_windows = 0
+            cell_windows = [[[] for _col in range(num_cols)] for _row in range(num_rows)]
+            windows_by_direction = [0] * len(WindowCounts.DIRECTIONS)
+            for direction, (d_row, d_col) in enumerate(WindowCounts.DIRECTIONS):
+                for row in range(num_rows):
+                    for col in range(num_cols):
+                        cells = [(row + i * d_row, col + i * d_col) for i in range(4)]
+                        if all(0 <= r < num_rows and 0 <= c < num_cols for r, c in cells):
+                            for r, c in cells:
+                                cell_windows[r][c].append((num_windows, 5 * direction))
+                            num_windows += 1
+                            windows_by_direction[direction] += 1
+            layout = (cell_windows, windows_by_direction)
+            WindowCounts.__layouts[(num_rows, num_cols)] = layout
+        return layout
+
+    """
+    builds the counts of the checkers in a grid (see Connect4State.get_grid)
+    """
+    @staticmethod
+    def from_grid(grid, empty_cell: int):
+        counts = WindowCounts(len(grid), len(grid[0]))
+        for row, cells in enumerate(grid):
+            for col, cell in enumerate(cells):
+                if cell != empty_cell:
+                    counts.add(row, col, cell)
+        return counts
+
+    """
+    updates the windows through a cell when a player drops a checker in it
+    """
+    def add(self, row: int, col: int, player: int):
+        own, other = self.__occupancy[player], self.__occupancy[1 - player]
+        own_open, other_open = self.__open[player], self.__open[1 - player]
+        for window, offset in self.__cell_windows[row][col]:
+            count = own[window]
+            if other[window] == 0:
+                own_open[offset + count] -= 1
+                own_open[offset + count + 1] += 1
+            if count == 0:
+                # the window is no longer open for the opponent
+                other_open[offset + other[window]] -= 1
+            own[window] = count + 1
+
+    """
+    updates the windows through a cell when the checker of a player is removed from it
+    """
+    def remove(self, row: int, col: int, player: int):
+        own, other = self.__occupancy[player], self.__occupancy[1 - player]
+        own_open, other_open = self.__open[player], self.__open[1 - player]
+        for window, offset in self.__cell_windows[row][col]:
+            count = own[window] - 1
+            if other[window] == 0:
+                own_open[offset + count + 1] -= 1
+                own_open[offset + count] += 1
+            if count == 0:
+                # the window is open again for the opponent
+                other_open[offset + other[window]] += 1
+            own[window] = count
+
+    """
+    the number of open windows with a number of checkers of a player
+    :param direction: only count the windows of a direction (HORIZONTAL, VERTICAL, DIAGONAL or ANTI_DIAGONAL)
+    """
+    def get_num_open(self, player: int, num_checkers: int, direction: int = None) -> int:
+        counts = self.__open[player]
+        if direction is not None:
+            return counts[5 * direction + num_checkers]
+        return counts[num_checkers] + counts[5 + num_checkers] + counts[10 + num_checkers] + counts[15 + num_checkers]
+
+    """
+    the number of checkers of a player in each window (the windows of a board size are always in the same order)
+    """
+    def get_occupancy(self, player: int):
+        return self.__occupancy[player]
+
+    def get_num_windows(self) -> int:
+        return len(self.__occupancy[0])
+
+    def copy(self):
+        copied = WindowCounts.__new__(WindowCounts)
+        copied.__cell_windows = self.__cell_windows
+        copied.__occupancy = [self.__occupancy[0].copy(), self.__occupancy[1].copy()]
+        copied.__open = [self.__open[0].copy(), self.__open[1].copy()]
+        return copied
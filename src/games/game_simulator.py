@@ -1,12 +1,23 @@
+import time
 from abc import ABC, abstractmethod
 
 from games.player import Player
+from games.results import ResultsStore, ResultsView
+from games.seating import SeatScheduler
 from games.state import State
+from games.state_view import StateView
 
 
 class GameSimulator(ABC):
 
-    def __init__(self, players: list):
+    """
+    :param players: the players of the simulation
+    :param results_mode: how the results of each game are stored (see ResultsStore), the aggregated
+                         scores are always available
+    :param seating: how the seats are rotated by change_player_positions (see SeatScheduler)
+    """
+    def __init__(self, players: list, results_mode: str = ResultsStore.MEMORY,
+                 seating: str = SeatScheduler.PERMUTATIONS):
         # only allow list of players
         assert len(list(filter(lambda p: not isinstance(p, Player), players))) <= 0
 
@@ -14,59 +25,47 @@ class GameSimulator(ABC):
         names = [player.get_name() for player in players]
         assert len(names) == len(set(names)), "Player names must be unique"
 
-        # stores the possible permutations between players
-        self.__permutations = []
-
-        self.heap_permutation(players, len(players))
+        # computes the order of the players in each game (permutations are only built when needed)
+        self.__seating = SeatScheduler(players, seating)
 
         # the selected permutation for the current game
         self.__current_permutation = 0
+        self.__current_players = self.__seating.get_permutation(0)
 
         # the results of all games between all players
-        self.__results = []
-
-    """
-    Adapted from https://www.geeksforgeeks.org/heaps-algorithm-for-generating-permutations/
-    It allows for generating all possible permutations of seats in a game
-    """
-
-    def heap_permutation(self, a: list, size: int):
-        if size == 1:
-            self.__permutations.append(a.copy())
+        self.__results = ResultsStore(len(players), results_mode)
 
-        for i in range(0, size):
-            self.heap_permutation(a, size - 1)
+        # running aggregates of the results, so score queries do not need to walk the results
+        self.__num_games = 0
+        self.__scores = {name: 0 for name in names}
+        self.__squared_scores = {name: 0 for name in names}
 
-            if size % 2 == 1:
-                temp = a[0]
-                a[0] = a[size - 1]
-                a[size - 1] = temp
-            else:
-                temp = a[i]
-                a[i] = a[size - 1]
-                a[size - 1] = temp
+        # outcomes of the games between deterministic players, keyed by (seat order, initial state key)
+        self.__memoized_games = {}
 
     """
     Swaps the order of the players. The order is changed in a way that guarantees that all combinations are considered
+    (all permutations, or all the rows of a balanced latin square, depending on the seating mode)
     Example for 2 players [a,b]
         - iteration 1: a,b
         - iteration 2, b,a
         - iteration 3, a,b (back to the initial configuration)
     
-    Example for 3 players [x,y,z]
+    Example for 3 players [x,y,z], with the default seating mode
         - iteration 1: x,y,z
-        - iteration 2: y,x,z
-        - iteration 3: z,x,y
-        - iteration 4: x,z,y
-        - iteration 5: y,z,x
+        - iteration 2: x,z,y
+        - iteration 3: y,x,z
+        - iteration 4: y,z,x
+        - iteration 5: z,x,y
         - iteration 6: z,y,x
-        - iteration 6: x,y,z (back to the initial configuration)
+        - iteration 7: x,y,z (back to the initial configuration)
     """
 
     def change_player_positions(self):
         self.__current_permutation += 1
-        if self.__current_permutation >= len(self.__permutations):
+        if self.__current_permutation >= len(self.__seating):
             self.__current_permutation = 0
+        self.__current_players = self.__seating.get_permutation(self.__current_permutation)
 
     """
     starts a new game
@@ -102,21 +101,51 @@ class GameSimulator(ABC):
         pass
 
 
-    def get_player_positions(self):
-        return self.__permutations[self.__current_permutation]
+    """
+    Returns a key that identifies the initial state of the next game, or None if the initial state is random.
+    Games between deterministic players that start from the same initial state always have the same outcome,
+    so the simulator only plays them once. Simulators with a fixed initial state should override this method
+    """
+    def get_initial_state_key(self):
+        return None
+
+    # gets the key of the next game if its outcome can be memoized, None otherwise
+    def __get_memoized_game_key(self, players):
+        if not all(player.DETERMINISTIC for player in players):
+            return None
+        initial_state_key = self.get_initial_state_key()
+        if initial_state_key is None:
+            return None
+        return tuple(player.get_name() for player in players), initial_state_key
 
     """
     runs the simulation
     """
     def run_simulation(self):
-        state = self.on_init_game()
         players = self.get_player_positions()
 
+        # replay the outcome of a game that was already played between the same deterministic players
+        memoized_game_key = self.__get_memoized_game_key(players)
+        if memoized_game_key in self.__memoized_games:
+            for pos in range(0, len(players)):
+                players[pos].set_current_pos(pos)
+            result, payoffs, num_moves = self.__memoized_games[memoized_game_key]
+            self.__add_result(result, payoffs, num_moves, 0.0)
+            return
+
+        state = self.on_init_game()
+
         # notify players a new game is starting
         for pos in range(0, len(players)):
             players[pos].set_current_pos(pos)
             players[pos].event_new_game()
 
+        # only the players that consume the state notifications get them
+        action_listeners = [player for player in players if player.is_subscribed("event_action")]
+
+        start_time = time.perf_counter()
+        num_moves = 0
+
         # play a turn
         while not state.is_finished():
             selected_action = None
@@ -124,15 +153,16 @@ class GameSimulator(ABC):
 
             # obtain a valid action
             while True:
-                selected_action = players[pos].get_action(state.clone())
+                selected_action = players[pos].get_action(StateView(state))
                 if state.validate_action(selected_action):
                     break
 
             state.play(selected_action)
+            num_moves += 1
 
-            # notify players of the action
-            for player in players:
-                player.event_action(pos, selected_action, state.clone())
+            # notify players of the action (players get a read-only view, the state is only copied if they change it)
+            for player in action_listeners:
+                player.event_action(pos, selected_action, StateView(state))
 
             # the simulator will run an optional hanlder for each updated state
             self.on_state_update(state)
@@ -140,6 +170,8 @@ class GameSimulator(ABC):
         # handler to run before the game ends
         self.on_before_end_game(state)
 
+        duration = time.perf_counter() - start_time
+
         result = {}
         for player in players:
             # notify the player of the result in each position
@@ -148,45 +180,82 @@ class GameSimulator(ABC):
 
             # store the result for that player
             result[player.get_name()] = state.get_result(player.get_current_pos())
-            player.event_end_game(state.clone())
+            if player.is_subscribed("event_end_game"):
+                player.event_end_game(StateView(state))
 
-        self.__results.append(result)
+        payoffs = [state.get_result(pos) for pos in range(len(players))]
+        self.__add_result(result, payoffs, num_moves, duration)
+
+        if memoized_game_key is not None:
+            self.__memoized_games[memoized_game_key] = (result, payoffs, num_moves)
 
         # handler to run after a game ends
         self.on_end_game(state)
 
+    # stores the result of a game and updates the running aggregates
+    def __add_result(self, result, payoffs, num_moves, duration):
+        self.__results.append(self.__current_permutation, payoffs, num_moves, duration)
+        self.__num_games += 1
+        for name, score in result.items():
+            self.__scores[name] += score
+            self.__squared_scores[name] += score * score
+
     # prints the stats for all players
     def print_stats(self):
-        scores = self.get_global_score()
-        for player in self.__permutations[0]:
+        for player in self.get_players():
             name = player.get_name()
-            print(f"Player {name} | Total score: {scores[name]}$ | Avg. score per game: {scores[name] / len(self.__results)}$")
+            print(f"Player {name} | Total score: {self.__scores[name]}$ | Avg. score per game: {self.get_mean_score(name)}$")
 
     # returns the list of players
     def get_players(self):
-        return self.__permutations[0]
+        return self.__seating.get_players()
 
     # returns the ordered list of players for the current permutation
     def get_player_positions(self):
-        return self.__permutations[self.__current_permutation]
+        return self.__current_players
 
     # gets the number os players
     def num_players(self):
-        return len(self.__permutations[0])
+        return len(self.get_players())
 
-    # gets the results of all games
+    # gets the results of all games, as a lazy sequence with one dictionary (player name -> score) per game
     def get_results(self):
+        return ResultsView(self.__results, self.__seating.get_permutation)
+
+    # gets the store with the per-seat results of all games
+    def get_results_store(self):
         return self.__results
 
+    # appends the results of another simulation between the same players (e.g. a shard run in another process)
+    def merge_results(self, other):
+        assert [p.get_name() for p in other.get_players()] == [p.get_name() for p in self.get_players()], \
+            "Only simulations between the same players can be merged"
+        self.__results.extend(other.get_results_store())
+        self.__num_games += other.get_num_games()
+        for name, score in other.get_global_score().items():
+            self.__scores[name] += score
+            self.__squared_scores[name] += other.get_squared_score(name)
+
+    # gets the number of games that were played
+    def get_num_games(self):
+        return self.__num_games
+
     # gets the scores of all players
     def get_global_score(self):
-        scores = {}
-        for player in self.__permutations[0]:
-            name = player.get_name()
-            scores[name] = 0
-            for result in self.__results:
-                scores[name] += result[name]
-        return scores
+        return dict(self.__scores)
+
+    # gets the sum of the squared scores of a player (used to compute its variance)
+    def get_squared_score(self, name):
+        return self.__squared_scores[name]
+
+    # gets the average score per game of a player
+    def get_mean_score(self, name):
+        return self.__scores[name] / self.__num_games
+
+    # gets the (population) variance of the score per game of a player
+    def get_score_variance(self, name):
+        mean = self.get_mean_score(name)
+        return max(0.0, self.__squared_scores[name] / self.__num_games - mean * mean)
 
 
     @staticmethod
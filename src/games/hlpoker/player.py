@@ -46,6 +46,7 @@ class HLPokerPlayer(Player, ABC):
         return self.__score
 
     def start_new_game(self, private_cards):
+        self.__num_games += 1
         self.__private_cards = private_cards.copy()
         self.__opponent_cards = [None, None]
         self.__board_cards = []
@@ -91,6 +92,12 @@ class HLPokerPlayer(Player, ABC):
         print(
             f"Player {self.get_name()} | Total profit: ${self.__score} | Profit per game: ${self.get_expected_value()}")
 
+    """
+    gets the average profit per game played so far
+    """
+    def get_expected_value(self):
+        return self.__score / self.__num_games if self.__num_games > 0 else 0
+
     """
     Overrides the original get_action method but includes the cards
     The cards are not part of the game state, but rather hidden information
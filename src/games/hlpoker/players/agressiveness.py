@@ -5,6 +5,10 @@ from games.hlpoker.state import HLPokerState
 from games.state import State
 
 class AgressivenessHLPokerPlayer(HLPokerPlayer):
+
+    SUBSCRIBED_EVENTS = frozenset({"event_action"})
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
         self.__hand_strength_threshold = 0.6
@@ -7,6 +7,9 @@ from games.state import State
 
 class AlwaysRaiseHLPokerPlayer(HLPokerPlayer):
 
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
 
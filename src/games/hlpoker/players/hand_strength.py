@@ -5,6 +5,10 @@ from games.hlpoker.state import HLPokerState
 from games.state import State
 
 class HandStrengthHLPokerPlayer(HLPokerPlayer):
+
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
 
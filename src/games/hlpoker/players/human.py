@@ -7,6 +7,8 @@ from games.state import State
 
 class HumanHLPokerPlayer(HLPokerPlayer):
 
+    SUBSCRIBED_EVENTS = frozenset({"event_action", "event_end_game"})
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -6,6 +6,9 @@ from random import choice
 
 
 class RandomHLPokerPlayer(HLPokerPlayer):
+
+    SUBSCRIBED_EVENTS = frozenset()
+
     def __init__(self, name):
         super().__init__(name)
 
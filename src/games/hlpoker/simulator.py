@@ -12,8 +12,8 @@ from games.hlpoker.player import HLPokerPlayer
 
 class HLPokerSimulator(GameSimulator):
 
-    def __init__(self, players: list[HLPokerPlayer]):
-        super().__init__(players)
+    def __init__(self, players: list[HLPokerPlayer], **kwargs):
+        super().__init__(players, **kwargs)
         """
         deck of cards
         """
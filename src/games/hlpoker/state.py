@@ -52,6 +52,10 @@ class HLPokerState(State):
         number of actions in the current round.
         """
         self.__winner = None
+        """
+        the values of the state before each action performed with apply, so they can be reverted with undo
+        """
+        self.__applied_actions = []
 
     def get_num_players(self):
         return self.__num_players
@@ -115,6 +119,16 @@ class HLPokerState(State):
         if self.__round == Round.Showdown:
             self.__is_finished = True
 
+    def apply(self, action):
+        self.__applied_actions.append((self.__acting_player, self.__is_finished, self.__bets.copy(), self.__round,
+                                       self.__raise_count, self.__actions_this_round, self.__winner))
+        self.update(action)
+
+    def undo(self):
+        self.__sequence.pop()
+        (self.__acting_player, self.__is_finished, self.__bets, self.__round,
+         self.__raise_count, self.__actions_this_round, self.__winner) = self.__applied_actions.pop()
+
     def display(self):
         for action in self.__sequence:
             print(f"{action}", end=" > ")
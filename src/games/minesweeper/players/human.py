@@ -8,6 +8,8 @@ from games.minesweeper.state import MinesweeperState
 
 class HumanMinesweeperPlayer(MinesweeperPlayer):
 
+    SUBSCRIBED_EVENTS = frozenset({"event_end_game"})
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -6,6 +6,10 @@ from games.state import State
 
 
 class ProbabilityMinesweeperPlayer(MinesweeperPlayer):
+
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
 
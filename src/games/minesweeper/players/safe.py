@@ -5,6 +5,9 @@ from games.state import State
 
 class PlaySafeMinesweeperPlayer(MinesweeperPlayer):
 
+    SUBSCRIBED_EVENTS = frozenset()
+    DETERMINISTIC = True
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -6,8 +6,8 @@ from games.game_simulator import GameSimulator
 
 class MinesweeperSimulator(GameSimulator):
 
-    def __init__(self, players, num_rows: int = 7, num_cols: int = 7):
-        super(MinesweeperSimulator, self).__init__(players)
+    def __init__(self, players, num_rows: int = 7, num_cols: int = 7, **kwargs):
+        super(MinesweeperSimulator, self).__init__(players, **kwargs)
         """
         the number of rows and cols from the Minesweeper grid
         """
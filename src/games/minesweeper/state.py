@@ -38,6 +38,11 @@ class MinesweeperState(State):
         self.__mines_hit = [0, 0]
         self.__has_winner = False
 
+        """
+        the actions performed with apply, as (row, col, had_winner), so they can be reverted with undo
+        """
+        self.__applied_actions = []
+
     def __place_mines(self):
         mines = set()
         while len(mines) < self.__num_mines:
@@ -77,6 +82,21 @@ class MinesweeperState(State):
         self.__acting_player = 1 - self.__acting_player
         self.__has_winner = len(self.__mines) == sum(self.__mines_hit)
 
+    def apply(self, action: MinesweeperAction):
+        self.__applied_actions.append((action.get_row(), action.get_col(), self.__has_winner))
+        self.update(action)
+
+    def undo(self):
+        row, col, had_winner = self.__applied_actions.pop()
+        self.__acting_player = 1 - self.__acting_player
+
+        if self.__grid[row][col] == MinesweeperState.MINE_CELL:
+            self.__mines_hit[self.__acting_player] -= 1
+
+        self.__grid[row][col] = MinesweeperState.EMPTY_CELL
+        self.__grid_players[row][col] = MinesweeperState.EMPTY_CELL
+        self.__has_winner = had_winner
+
     def validate_action(self, action: MinesweeperAction) -> bool:
         row, col = action.get_row(), action.get_col()
 
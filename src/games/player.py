@@ -5,6 +5,20 @@ from games.state import State
 
 class Player(ABC):
 
+    """
+    The events that carry a game state (event_action and event_end_game) are only dispatched to the players that
+    subscribe to them. A player that ignores some of these events should override this set with the events it
+    actually consumes, so the simulator can skip those notifications (and building their state) altogether
+    """
+    SUBSCRIBED_EVENTS = frozenset({"event_action", "event_end_game"})
+
+    """
+    A deterministic player always chooses the same action for the same state and position (no randomness, and
+    nothing learned from previous games). When all the players of a game are deterministic and the game starts
+    from a known initial state, the simulator replays the memoized outcome instead of playing the game again
+    """
+    DETERMINISTIC = False
+
     """
     :param name: name of the player (simply a text identifier for the player)
     """
@@ -35,6 +49,13 @@ class Player(ABC):
     def set_current_pos(self, new_pos):
         self.__current_pos = new_pos
 
+    """
+    checks if the player consumes a given event
+    :param event: the name of the event method (e.g. "event_action")
+    """
+    def is_subscribed(self, event: str) -> bool:
+        return event in self.SUBSCRIBED_EVENTS
+
     """
     prints to the console the stats of the player
     """
@@ -0,0 +1,141 @@
+import mmap
+import os
+import struct
+
+
+class QTable:
+    """
+    A learned table of values (e.g. Q-values) stored as a binary file and read through mmap.
+
+    The file has a fixed header followed by fixed-width (key, action, value) records sorted by key and action.
+    The entries are addressed by a single integer, key * num_actions + action, which sorts in the same order as
+    the records. Lookups are a binary search over the mapped file, so opening a table does not parse anything,
+    and all the processes that open the same file share its pages through the page cache.
+    Tables are written to a temporary file that replaces the old one, so a process that still maps the old
+    file keeps reading a consistent table.
+    """
+
+    """
+    magic, version, number of actions, number of records
+    """
+    HEADER = struct.Struct('<4sBBxxQ')
+    MAGIC = b'QTBL'
+    VERSION = 1
+
+    """
+    key, action, value
+    """
+    RECORD = struct.Struct('<QBd')
+
+    """
+    the maximum number of bits of the keys (and actions) of the records
+    """
+    MAX_KEY_BITS = 64
+    MAX_ACTION_BITS = 8
+
+    """
+    the tables already opened by this process, by path
+    """
+    __tables = {}
+
+    def __init__(self, path):
+        self.__path = path
+        with open(path, 'rb') as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.__num_actions, self.__num_records = QTable.HEADER.unpack_from(self.__data, 0)
+        if magic != QTable.MAGIC or version != QTable.VERSION:
+            raise ValueError(f"'{path}' is not a Q-table")
+
+    """
+    opens the table at a path, or returns None if there is no table there. Each path is only mapped once per process
+    """
+    @staticmethod
+    def open(path):
+        path = os.path.abspath(path)
+        if path not in QTable.__tables:
+            QTable.__tables[path] = QTable(path) if os.path.isfile(path) else None
+        return QTable.__tables[path]
+
+    def __reduce__(self):
+        # a pickled table (e.g. held by a player sent to another process) maps the file again on the other side
+        return QTable.open, (self.__path,)
+
+    def get_num_actions(self):
+        return self.__num_actions
+
+    def __len__(self):
+        return self.__num_records
+
+    def __get_record(self, index):
+        key, action, value = QTable.RECORD.unpack_from(self.__data, QTable.HEADER.size + index * QTable.RECORD.size)
+        return key * self.__num_actions + action, value
+
+    """
+    retrieves the value of an entry, or None if the entry is not in the table
+    :param entry: key * num_actions + action
+    """
+    def lookup(self, entry: int):
+        low, high = 0, self.__num_records
+        while low < high:
+            middle = (low + high) // 2
+            record_entry, value = self.__get_record(middle)
+            if record_entry == entry:
+                return value
+            if record_entry < entry:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    """
+    iterates over the (entry, value) of the table, in order
+    """
+    def items(self):
+        for index in range(0, self.__num_records):
+            yield self.__get_record(index)
+
+    """
+    writes a table, replacing the file at path
+    :param items: the (entry, value) of the table, sorted by entry
+    """
+    @staticmethod
+    def save(path, num_actions: int, items):
+        if num_actions >= 1 << QTable.MAX_ACTION_BITS:
+            raise ValueError(f"A Q-table can not hold more than {(1 << QTable.MAX_ACTION_BITS) - 1} actions")
+        path = os.path.abspath(path)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        num_records = 0
+        with open(temporary_path, 'wb') as file:
+            file.write(QTable.HEADER.pack(QTable.MAGIC, QTable.VERSION, num_actions, 0))
+            for entry, value in items:
+                key, action = divmod(entry, num_actions)
+                if key >> QTable.MAX_KEY_BITS:
+                    os.remove(temporary_path)
+                    raise ValueError(f"The key {key} does not fit in the {QTable.MAX_KEY_BITS} bits of a Q-table record")
+                file.write(QTable.RECORD.pack(key, action, value))
+                num_records += 1
+            # the number of records is only known at the end
+            file.seek(0)
+            file.write(QTable.HEADER.pack(QTable.MAGIC, QTable.VERSION, num_actions, num_records))
+        os.replace(temporary_path, path)
+        QTable.__tables.pop(path, None)
+
+    """
+    merges the entries of a table (or None) with newer values, keeping the newer value of the entries in both
+    :return: the (entry, value) of the merged table, sorted by entry
+    """
+    @staticmethod
+    def merge(table, values: dict):
+        updates = sorted(values.items())
+        update_index = 0
+        for entry, value in (table.items() if table is not None else ()):
+            while update_index < len(updates) and updates[update_index][0] < entry:
+                yield updates[update_index]
+                update_index += 1
+            if update_index < len(updates) and updates[update_index][0] == entry:
+                yield updates[update_index]
+                update_index += 1
+            else:
+                yield entry, value
+        yield from updates[update_index:]
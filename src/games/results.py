@@ -0,0 +1,223 @@
+import tempfile
+from array import array
+from collections.abc import Sequence
+
+
+class ResultsStore:
+    """
+    A compact, columnar store for the results of the games of a simulation.
+    For each game it keeps the payoff of each seat, the index of the seat permutation that was used,
+    the number of moves and the duration of the game, in typed arrays instead of one dictionary per game.
+
+    The store supports three modes:
+        - MEMORY: every column is kept in memory
+        - SPILL: once a column reaches spill_threshold games it is appended to a temporary file on disk
+        - STREAMING: no per-game data is kept at all (only the number of games)
+    """
+    MEMORY = "memory"
+    SPILL = "spill"
+    STREAMING = "streaming"
+
+    MODES = (MEMORY, SPILL, STREAMING)
+
+    """
+    the typecodes of the columns of the store
+    """
+    __COLUMNS = {
+        "payoffs": "d",
+        "permutations": "Q",
+        "moves": "L",
+        "durations": "d"
+    }
+
+    def __init__(self, num_seats: int, mode: str = MEMORY, spill_threshold: int = 65536):
+        if mode not in ResultsStore.MODES:
+            raise ValueError(f"Unknown results mode '{mode}', it must be one of {', '.join(ResultsStore.MODES)}")
+        if spill_threshold < 1:
+            raise ValueError("The spill threshold must be at least 1")
+
+        self.__num_seats = num_seats
+        self.__mode = mode
+        self.__spill_threshold = spill_threshold
+
+        """
+        number of games stored (in memory and on disk)
+        """
+        self.__num_games = 0
+
+        """
+        number of games that were spilled to disk
+        """
+        self.__num_spilled = 0
+
+        """
+        the in-memory columns (the payoffs column holds num_seats values per game)
+        """
+        self.__columns = {name: array(typecode) for name, typecode in ResultsStore.__COLUMNS.items()}
+
+        """
+        the temporary files where the columns are spilled (only in SPILL mode)
+        """
+        self.__files = None
+
+    def get_mode(self):
+        return self.__mode
+
+    def get_num_seats(self):
+        return self.__num_seats
+
+    def keeps_games(self):
+        return self.__mode != ResultsStore.STREAMING
+
+    def __len__(self):
+        return self.__num_games
+
+    """
+    stores the result of a game
+    :param permutation: index of the seat permutation used in the game
+    :param payoffs: the payoff of each seat
+    :param moves: number of moves of the game
+    :param duration: duration of the game, in seconds
+    """
+    def append(self, permutation: int, payoffs, moves: int = 0, duration: float = 0.0):
+        self.__num_games += 1
+        if self.__mode == ResultsStore.STREAMING:
+            return
+
+        self.__columns["payoffs"].extend(payoffs)
+        self.__columns["permutations"].append(permutation)
+        self.__columns["moves"].append(moves)
+        self.__columns["durations"].append(duration)
+
+        if self.__mode == ResultsStore.SPILL and len(self.__columns["permutations"]) >= self.__spill_threshold:
+            self.__spill()
+
+    """
+    appends all the games of another store (with the same number of seats). A store that keeps the games can only
+    be extended with another store that keeps them too
+    """
+    def extend(self, other):
+        if other.get_num_seats() != self.__num_seats:
+            raise ValueError("Only stores with the same number of seats can be merged")
+
+        if self.__mode == ResultsStore.STREAMING:
+            self.__num_games += len(other)
+            return
+
+        if not other.keeps_games():
+            raise ValueError("A store that streams its results can not be merged into a store that keeps the games")
+
+        for permutation, payoffs, moves, duration in other:
+            self.append(permutation, payoffs, moves, duration)
+
+    """
+    retrieves a game as a tuple (permutation, payoffs, moves, duration)
+    """
+    def get(self, index: int):
+        if not self.keeps_games():
+            raise ValueError("The games are not kept when the results are streamed")
+        if index < 0:
+            index += self.__num_games
+        if index < 0 or index >= self.__num_games:
+            raise IndexError("game index out of range")
+
+        if index < self.__num_spilled:
+            columns = self.__read_spilled(index, 1)
+            index = 0
+        else:
+            columns = self.__columns
+            index -= self.__num_spilled
+
+        payoffs = tuple(columns["payoffs"][index * self.__num_seats:(index + 1) * self.__num_seats])
+        return columns["permutations"][index], payoffs, columns["moves"][index], columns["durations"][index]
+
+    def __iter__(self):
+        if not self.keeps_games():
+            raise ValueError("The games are not kept when the results are streamed")
+
+        # spilled games are read back in chunks, so iterating never loads the whole file
+        for start in range(0, self.__num_spilled, self.__spill_threshold):
+            count = min(self.__spill_threshold, self.__num_spilled - start)
+            yield from ResultsStore.__iter_columns(self.__read_spilled(start, count), count, self.__num_seats)
+
+        yield from ResultsStore.__iter_columns(self.__columns, len(self.__columns["permutations"]), self.__num_seats)
+
+    @staticmethod
+    def __iter_columns(columns, count, num_seats):
+        payoffs = columns["payoffs"]
+        for index in range(count):
+            yield (columns["permutations"][index], tuple(payoffs[index * num_seats:(index + 1) * num_seats]),
+                   columns["moves"][index], columns["durations"][index])
+
+    def __spill(self):
+        if self.__files is None:
+            self.__files = {name: tempfile.TemporaryFile() for name in ResultsStore.__COLUMNS}
+
+        for name, typecode in ResultsStore.__COLUMNS.items():
+            self.__files[name].seek(0, 2)
+            self.__columns[name].tofile(self.__files[name])
+            self.__columns[name] = array(typecode)
+
+        self.__num_spilled = self.__num_games
+
+    def __read_spilled(self, start: int, count: int):
+        columns = {}
+        for name, typecode in ResultsStore.__COLUMNS.items():
+            width = self.__num_seats if name == "payoffs" else 1
+            column = array(typecode)
+            self.__files[name].seek(start * width * column.itemsize)
+            column.fromfile(self.__files[name], count * width)
+            columns[name] = column
+        return columns
+
+    def __getstate__(self):
+        # temporary files can't be pickled (e.g. when a simulator is returned by a worker process),
+        # so the spilled games are read back into memory
+        state = self.__dict__.copy()
+        if self.__num_spilled > 0:
+            columns = self.__read_spilled(0, self.__num_spilled)
+            for name in ResultsStore.__COLUMNS:
+                columns[name].extend(self.__columns[name])
+            state["_ResultsStore__columns"] = columns
+        state["_ResultsStore__num_spilled"] = 0
+        state["_ResultsStore__files"] = None
+        return state
+
+    def close(self):
+        if self.__files is not None:
+            for file in self.__files.values():
+                file.close()
+            self.__files = None
+
+
+class ResultsView(Sequence):
+    """
+    A read-only, lazy view of the results stored in a ResultsStore, where each game is presented
+    as a dictionary with the payoff of each player, keyed by the player name
+    (the format originally returned by GameSimulator.get_results)
+    """
+
+    """
+    :param store: the results store
+    :param get_permutation: function that returns the ordered list of players of a permutation index
+    """
+    def __init__(self, store: ResultsStore, get_permutation):
+        self.__store = store
+        self.__get_permutation = get_permutation
+
+    def __len__(self):
+        return len(self.__store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        permutation, payoffs, _moves, _duration = self.__store.get(index)
+        return self.__to_dict(permutation, payoffs)
+
+    def __iter__(self):
+        for permutation, payoffs, _moves, _duration in self.__store:
+            yield self.__to_dict(permutation, payoffs)
+
+    def __to_dict(self, permutation, payoffs):
+        players = self.__get_permutation(permutation)
+        return {player.get_name(): payoff for player, payoff in zip(players, payoffs)}
@@ -0,0 +1,94 @@
+import math
+
+
+class SeatScheduler:
+    """
+    Computes, on demand, the order in which the players sit at the table in each game.
+    No permutation is materialized up front: the permutation for a given index is built when requested.
+
+    There are two rotation modes:
+        - PERMUTATIONS: cycles through all the n! permutations of the players, in lexicographic order
+        - LATIN_SQUARE: cycles through the rows of a balanced (Williams) latin square. Every player sits in
+          every seat equally often, and every player follows every other player equally often, in a schedule
+          of n permutations (2n when the number of players is odd)
+
+    Example for 3 players [x,y,z]
+        - PERMUTATIONS: xyz, xzy, yxz, yzx, zxy, zyx
+        - LATIN_SQUARE: xyz, yzx, zxy, zyx, xzy, yxz
+    """
+    PERMUTATIONS = "permutations"
+    LATIN_SQUARE = "latin-square"
+
+    MODES = (PERMUTATIONS, LATIN_SQUARE)
+
+    def __init__(self, players: list, mode: str = PERMUTATIONS):
+        if mode not in SeatScheduler.MODES:
+            raise ValueError(f"Unknown seating mode '{mode}', it must be one of {', '.join(SeatScheduler.MODES)}")
+
+        self.__players = list(players)
+        self.__mode = mode
+
+        num_players = len(self.__players)
+        if mode == SeatScheduler.PERMUTATIONS:
+            self.__length = math.factorial(num_players)
+        else:
+            self.__length = num_players if num_players % 2 == 0 else 2 * num_players
+
+            """
+            the first row of the williams design: 0, 1, n-1, 2, n-2, ...
+            the other rows are obtained by adding the row index (mod n) to each element
+            """
+            self.__first_row = [0]
+            low, high = 1, num_players - 1
+            while low <= high:
+                self.__first_row.append(low)
+                low += 1
+                if low <= high:
+                    self.__first_row.append(high)
+                    high -= 1
+
+    def get_mode(self):
+        return self.__mode
+
+    """
+    the original order of the players (permutation 0)
+    """
+    def get_players(self):
+        return self.__players
+
+    """
+    the number of permutations before the schedule goes back to the initial configuration
+    """
+    def __len__(self):
+        return self.__length
+
+    """
+    builds the ordered list of players of a given permutation
+    :param index: index of the permutation, between [0, len(self)[
+    """
+    def get_permutation(self, index: int) -> list:
+        if index < 0 or index >= self.__length:
+            raise IndexError("permutation index out of range")
+
+        if self.__mode == SeatScheduler.PERMUTATIONS:
+            return self.__unrank_permutation(index)
+        return self.__latin_square_row(index)
+
+    def __unrank_permutation(self, index):
+        # decodes the index in the factorial number system to get the lexicographic permutation
+        remaining = self.__players.copy()
+        permutation = []
+        for size in range(len(remaining), 0, -1):
+            position, index = divmod(index, math.factorial(size - 1))
+            permutation.append(remaining.pop(position))
+        return permutation
+
+    def __latin_square_row(self, index):
+        num_players = len(self.__players)
+        row = [(element + index) % num_players for element in self.__first_row]
+
+        # with an odd number of players, the second half of the schedule uses the mirrored rows
+        if index >= num_players:
+            row.reverse()
+
+        return [self.__players[element] for element in row]
@@ -0,0 +1,71 @@
+import math
+
+
+class SequentialTest:
+    """
+    Sequential probability ratio test (SPRT) on the score difference between two players.
+    Each observation is the score difference (player 1 - player 2) of one iteration. The test compares the
+    hypotheses "player 1 is better by effect_size standard deviations" and "player 2 is better by effect_size
+    standard deviations", using a normal approximation with the running estimate of the standard deviation.
+    For normal observations the log-likelihood ratio of the two hypotheses is 2 * effect_size * sum / std,
+    and the test is decided once it crosses log((1 - alpha) / alpha) in either direction.
+
+    If every observation is the same (zero variance), the outcome is considered settled after min_observations.
+    """
+
+    def __init__(self, alpha: float = 0.05, effect_size: float = 0.1, min_observations: int = 2):
+        if not 0 < alpha < 0.5:
+            raise ValueError("alpha must be between 0 and 0.5")
+        if effect_size <= 0:
+            raise ValueError("the effect size must be positive")
+
+        self.__effect_size = effect_size
+        self.__min_observations = max(2, min_observations)
+
+        """
+        the boundary of the log-likelihood ratio
+        """
+        self.__bound = math.log((1 - alpha) / alpha)
+
+        """
+        running statistics of the observations
+        """
+        self.__count = 0
+        self.__sum = 0.0
+        self.__squared_sum = 0.0
+
+    def add(self, difference: float):
+        self.__count += 1
+        self.__sum += difference
+        self.__squared_sum += difference * difference
+
+    def get_count(self):
+        return self.__count
+
+    def get_mean(self):
+        return self.__sum / self.__count if self.__count > 0 else 0.0
+
+    def get_std(self):
+        if self.__count < 2:
+            return 0.0
+        variance = (self.__squared_sum - self.__sum * self.__sum / self.__count) / (self.__count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    """
+    the log-likelihood ratio of "player 1 is better" against "player 2 is better"
+    """
+    def get_log_likelihood_ratio(self):
+        std = self.get_std()
+        if std == 0.0:
+            return math.copysign(math.inf, self.__sum) if self.__sum != 0 else 0.0
+        return 2 * self.__effect_size * self.__sum / std
+
+    """
+    returns true once the test settled which player is better (or that the outcome never changes)
+    """
+    def is_decided(self) -> bool:
+        if self.__count < self.__min_observations:
+            return False
+        if self.get_std() == 0.0:
+            return True
+        return abs(self.get_log_likelihood_ratio()) >= self.__bound
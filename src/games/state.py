@@ -64,6 +64,27 @@ class State(ABC):
     def clone(self):
         pass
 
+    """
+    Applies an action to the state in a way that can be reverted with undo (make/unmake).
+    Search players can use apply/undo to explore the game tree on a single state instead of cloning it on every node.
+    The default implementation keeps a clone of the state before the action, states can override both methods
+    with a cheaper version
+    :param action: the action to be performed (by the current acting player)
+    """
+    def apply(self, action):
+        if "_State__snapshots" not in self.__dict__:
+            self.__snapshots = []
+        self.__snapshots.append(self.clone())
+        self.update(action)
+
+    """
+    Reverts the last action performed with apply
+    """
+    def undo(self):
+        snapshots = self.__snapshots
+        self.__dict__ = snapshots.pop().__dict__
+        self.__snapshots = snapshots
+
     """
     Retrieves the game result for a player in a given position
     :param pos: position of the player in the game [0, num_players[
@@ -0,0 +1,56 @@
+class StateView:
+    """
+    A read-only view of a game state, handed to the players instead of a clone of the state.
+    Reading methods are forwarded to the state of the simulator without copying it. The state is only
+    cloned (copy-on-write) the first time a mutating method is called through the view, and the methods that
+    return the internal lists of the state return read-only copies of them (tuples), so a player can not change
+    the state of the simulator through the view. The view passes isinstance checks of the class of the state.
+    Note: those copies are made on every call (e.g. get_grid copies every cell of the board), so players that only
+    read a few cells should prefer the accessors that return single values (e.g. Connect4State.get_cell).
+    Note: the view follows the state of the simulator, so it is only meaningful while the player is
+    handling the call that received it. A player that wants to keep a state for later must clone() it.
+    """
+
+    """
+    methods that change the state and therefore require a private copy of it
+    """
+    MUTATING_METHODS = frozenset({"update", "play", "apply", "undo", "before_results", "compute_results"})
+
+    """
+    methods that return mutable internals of the state, whose result is returned as a read-only copy
+    """
+    COPIED_METHODS = frozenset({"get_grid", "get_sequence", "get_heights", "get_window_occupancy"})
+
+    def __init__(self, state):
+        self.__state = state
+        self.__is_copy = False
+
+    def __getattr__(self, name):
+        if name in StateView.MUTATING_METHODS and not self.__is_copy:
+            self.__state = self.__state.clone()
+            self.__is_copy = True
+        if name in StateView.COPIED_METHODS and not self.__is_copy:
+            method = getattr(self.__state, name)
+            return lambda *args, **kwargs: StateView.__freeze(method(*args, **kwargs))
+        return getattr(self.__state, name)
+
+    @staticmethod
+    def __freeze(value):
+        if isinstance(value, list):
+            return tuple(StateView.__freeze(item) for item in value)
+        return value
+
+    @property
+    def __class__(self):
+        # isinstance(view, Connect4State) holds when the view wraps a Connect4State
+        return self.__state.__class__
+
+    def __reduce__(self):
+        # a pickled view is rebuilt around its own copy of the state
+        return StateView, (self.__state,)
+
+    """
+    copies the viewed game state
+    """
+    def clone(self):
+        return self.__state.clone()
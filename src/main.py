@@ -1,49 +1,188 @@
 import argparse
 import itertools
+import random
 from collections import namedtuple, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
 from tqdm import tqdm
 
 from constants import AVAILABLE_GAME_TYPES, AVAILABLE_PLAYER_TYPES
+from games.results import ResultsStore
+from games.seating import SeatScheduler
+from games.sequential_test import SequentialTest
 
 def run_simulation(game_settings):
     removed_players = []
+    workers = game_settings.get('workers')
 
-    while len(game_settings['players']) > 1:
-        scores = defaultdict(int)
-        match_results = defaultdict(dict)
+    # the global scores of every pairing that was already played, keyed by the pair of player names
+    # a pairing is only played once: later elimination rounds reuse its result
+    pairing_results = {}
 
-        for player1, player2 in itertools.combinations(game_settings['players'], 2):
-            simulator = game_settings['game']([player1, player2])
-            print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+    # the process pool is shared by all the elimination rounds
+    executor = ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 else None
 
-            names = {player1.get_name(): player1, player2.get_name(): player2}
+    try:
+        while len(game_settings['players']) > 1:
+            scores = defaultdict(int)
+            match_results = defaultdict(dict)
 
-            # Run initial iterations with progress bar
-            for _ in tqdm(range(game_settings['num_iterations']), desc="Running iterations"):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
+            pairings = list(itertools.combinations(game_settings['players'], 2))
+            new_pairings = [pairing for pairing in pairings if get_pairing_key(*pairing) not in pairing_results]
+            if executor is None and game_settings.get('shards', 1) == 1 and game_settings.get('seed') is None:
+                simulators = map(lambda pairing: run_pairing(game_settings, *pairing), new_pairings)
+            else:
+                simulators = run_sharded_pairings(executor, game_settings, new_pairings)
 
-            # Run additional iterations if there's a draw
-            while check_draw(simulator):
-                run_game_iteration(simulator, game_settings['seat_permutation'])
+            for (player1, player2), simulator in zip(new_pairings, simulators):
+                pairing_results[get_pairing_key(player1, player2)] = simulator.get_global_score()
+                simulator.print_stats()
+                print_player_stats(game_settings, simulator)
 
-            update_scores(scores, simulator, names)
+            for player1, player2 in pairings:
+                result = pairing_results[get_pairing_key(player1, player2)]
+                names = {player1.get_name(): player1, player2.get_name(): player2}
 
-            # Update match results for cross table
-            update_match_results(match_results, simulator, player1, player2)
+                update_scores(scores, result, names)
 
-            simulator.print_stats()
+                # Update match results for cross table
+                update_match_results(match_results, result, player1, player2)
 
-        # Print cross table and leaderboard before removing a player
-        print_cross_table(match_results)
-        print_leaderboard(scores)
+            # Print cross table and leaderboard before removing a player
+            print_cross_table(match_results)
+            print_leaderboard(scores)
 
-        removed_player = remove_worst_player(game_settings['players'], scores)
-        removed_players.insert(0, removed_player)
+            removed_player = remove_worst_player(game_settings['players'], scores)
+            removed_players.insert(0, removed_player)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     last_remaining_player = game_settings['players'][0]
     removed_players.insert(0, last_remaining_player)
     print_leaderboard(removed_players, final=True)
 
+def print_player_stats(game_settings, simulator):
+    # only the players with their own stats (e.g. the search speed of the Connect4 search players) print them, the
+    # scores are already printed by the simulator. For sharded pairings these are the players of the first shard
+    player_type = game_settings['game'].get_player_type()
+    for player in simulator.get_players():
+        if type(player).print_stats is not player_type.print_stats:
+            player.print_stats()
+
+def run_pairing(game_settings, player1, player2):
+    simulator = create_simulator(game_settings, [player1, player2])
+    print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+
+    # Run initial iterations with progress bar
+    iterations = tqdm(range(game_settings['num_iterations']), desc="Running iterations")
+    test = run_iterations(simulator, game_settings, iterations, game_settings.get('min_iterations', 0))
+    iterations.close()
+
+    run_tie_break(simulator, game_settings, test)
+
+    return simulator
+
+def create_simulator(game_settings, players):
+    return game_settings['game'](players,
+                                 results_mode=game_settings.get('results_mode', ResultsStore.MEMORY),
+                                 seating=game_settings.get('seating', SeatScheduler.PERMUTATIONS))
+
+def create_sequential_test(game_settings, min_iterations):
+    if not game_settings.get('stop_when_significant'):
+        return None
+    return SequentialTest(min_observations=min_iterations)
+
+def run_iterations(simulator, game_settings, iterations, min_iterations):
+    # With --stop-when-significant the iterations stop as soon as the sequential test settles the winner
+    test = create_sequential_test(game_settings, min_iterations)
+    for _ in iterations:
+        run_tested_iteration(simulator, game_settings, test)
+        if test is not None and test.is_decided():
+            break
+    return test
+
+def run_tested_iteration(simulator, game_settings, test):
+    if test is None:
+        run_game_iteration(simulator, game_settings['seat_permutation'])
+        return
+
+    # The score difference of the iteration is the observation of the sequential test
+    player1, player2 = [player.get_name() for player in simulator.get_players()]
+    before = simulator.get_global_score()
+    run_game_iteration(simulator, game_settings['seat_permutation'])
+    after = simulator.get_global_score()
+    test.add((after[player1] - before[player1]) - (after[player2] - before[player2]))
+
+def run_tie_break(simulator, game_settings, test=None):
+    seed_random(game_settings, simulator.get_players(), 'tie-break')
+    if test is None:
+        test = create_sequential_test(game_settings, 0)
+
+    # Run additional iterations if there's a draw. The tie-break is bounded by the number of iterations and,
+    # with the sequential test, it also stops once the test settles that the outcome does not change
+    for _ in range(game_settings['num_iterations']):
+        if not check_draw(simulator) or (test is not None and test.is_decided()):
+            break
+        run_tested_iteration(simulator, game_settings, test)
+
+def run_shard(game_settings, player_types, shard, num_iterations):
+    # Each shard runs with freshly constructed players and its own random seed
+    players = [player_class(name) for name, player_class in player_types]
+    simulator = create_simulator(game_settings, players)
+    seed_random(game_settings, players, shard)
+
+    # the sequential test only runs with a single shard, which plays every iteration of the pairing
+    run_iterations(simulator, game_settings, range(num_iterations), game_settings.get('min_iterations', 0))
+
+    return simulator
+
+def run_sharded_pairings(executor, game_settings, pairings):
+    # Only what is needed to rebuild the pairing is sent to the workers
+    worker_settings = {key: value for key, value in game_settings.items() if key != 'players'}
+    tasks = map(lambda pairing: submit_shards(executor, worker_settings, *pairing), pairings)
+    if executor is not None:
+        # every pairing is submitted up front so the workers run them in parallel, without a pool each pairing
+        # only runs when its turn comes, after the header of the simulation is printed
+        tasks = list(tasks)
+    tasks = iter(tasks)
+
+    # Results are consumed in submission order so the output matches the serial path
+    for player1, player2 in tqdm(pairings, desc="Running pairings"):
+        print(f"Simulation: {player1.get_name()} VS {player2.get_name()}")
+        shards = next(tasks)
+        simulator = shards[0].result()
+        for shard in shards[1:]:
+            simulator.merge_results(shard.result())
+
+        run_tie_break(simulator, game_settings)
+
+        yield simulator
+
+def submit_shards(executor, game_settings, player1, player2):
+    player_types = [(player.get_name(), player.__class__) for player in (player1, player2)]
+    shard_iterations = split_iterations(game_settings['num_iterations'], game_settings.get('shards', 1))
+    return [submit_task(executor, run_shard, game_settings, player_types, shard, num_iterations)
+            for shard, num_iterations in enumerate(shard_iterations)]
+
+def submit_task(executor, function, *args):
+    # Without a process pool the task runs right away in the current process
+    if executor is None:
+        future = Future()
+        future.set_result(function(*args))
+        return future
+    return executor.submit(function, *args)
+
+def split_iterations(num_iterations, num_shards):
+    # Splits the iterations as evenly as possible, the first shards get the remainder
+    size, remainder = divmod(num_iterations, num_shards)
+    return [size + (1 if shard < remainder else 0) for shard in range(num_shards)]
+
+def seed_random(game_settings, players, stream):
+    # The seed of each stream only depends on the master seed and the pairing, never on the worker running it
+    if game_settings.get('seed') is not None:
+        names = ":".join(player.get_name() for player in players)
+        random.seed(f"{game_settings['seed']}:{names}:{stream}")
+
 def run_game_iteration(simulator, seat_permutation):
     simulator.run_simulation()
     if seat_permutation:
@@ -58,9 +197,11 @@ def check_draw(simulator):
         return True  # It's a draw
     return False  # Not a draw
 
-def update_scores(scores, simulator, names):
+def get_pairing_key(player1, player2):
+    return frozenset((player1.get_name(), player2.get_name()))
+
+def update_scores(scores, global_scores, names):
     # Update global scores for each player
-    global_scores = simulator.get_global_score()
     for player_name, score in global_scores.items():
         scores[names[player_name]] += score
 
@@ -70,8 +211,7 @@ def remove_worst_player(players, scores):
     players.remove(lowest_score_player)
     return lowest_score_player
 
-def update_match_results(match_results, simulator, player1, player2):
-    result = simulator.get_global_score()  # Assuming this method exists and returns the match result
+def update_match_results(match_results, result, player1, player2):
     match_results[player1.get_name()][player2.get_name()] = result[player1.get_name()]
     match_results[player2.get_name()][player1.get_name()] = result[player2.get_name()]
 
@@ -114,16 +254,57 @@ def main():
     parser.add_argument('--seat-permutation', action='store_true', default=True,
                         help='Permute seats during the simulation. Defaults to True.')
 
+    # Seat rotation mode (default: all permutations)
+    parser.add_argument('--seating', choices=SeatScheduler.MODES, default=SeatScheduler.PERMUTATIONS,
+                        help='How seats are rotated when permuted: through all permutations or the rows of a balanced latin square. Defaults to permutations.')
+
     # Number of iterations (default: 1)
     parser.add_argument('--num-iterations', type=int, default=10000,
                         help='Number of iterations in the simulation. Defaults to 10000.')
 
+    # Sequential early stopping (default: play every iteration)
+    parser.add_argument('--stop-when-significant', action='store_true', default=False,
+                        help='Stop a pairing as soon as a sequential test (SPRT) settles the winner. --num-iterations becomes the maximum number of iterations. Can not be combined with more than one shard.')
+
+    # Minimum number of iterations with sequential early stopping (default: 100)
+    parser.add_argument('--min-iterations', type=int, default=100,
+                        help='Minimum number of iterations of each pairing when --stop-when-significant is used. Defaults to 100.')
+
+    # Number of worker processes (default: run every pairing in the current process)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes used to run the pairings in parallel. Defaults to running them serially.')
+
+    # Number of shards per pairing (default: 1)
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Number of shards the iterations of each pairing are split into. Each shard runs as a separate task. Defaults to 1. Can not be combined with --stop-when-significant.')
+
+    # Master random seed (default: not seeded)
+    parser.add_argument('--seed', type=str, default=None,
+                        help='Master seed from which the seed of every shard is derived, making the results reproducible.')
+
+    # How the per-game results are stored (default: streaming, only the aggregated scores are needed)
+    parser.add_argument('--results-mode', choices=ResultsStore.MODES, default=ResultsStore.STREAMING,
+                        help='How the results of each game are stored: in memory, spilled to disk or streamed (only the aggregated scores are kept). Defaults to streaming.')
+
     # Player argument. This should be specified at least twice.
     parser.add_argument('--player', action='append', nargs=2, metavar=('NAME', 'TYPE'),
                         help='Add a player with a name and type. Requires two values. This option should be specified at least twice.')
 
     args = parser.parse_args()
 
+    if args.workers is not None and args.workers < 1:
+        parser.error('The number of workers must be at least 1.')
+
+    if args.min_iterations < 0:
+        parser.error('The minimum number of iterations can not be negative.')
+
+    if args.shards < 1:
+        parser.error('The number of shards must be at least 1.')
+
+    # Each shard would run its own sequential test on its slice of the iterations and stop on its own
+    if args.stop_when_significant and args.shards > 1:
+        parser.error('--stop-when-significant can not be combined with more than one shard.')
+
     # Check if at least two players are provided
     if args.player is None or len(args.player) < 2:
         parser.error('At least two --player arguments are required.')
@@ -160,7 +341,14 @@ def main():
     game_settings = {
         'game': AVAILABLE_GAME_TYPES[args.game],
         'seat_permutation': args.seat_permutation,
+        'seating': args.seating,
         'num_iterations': args.num_iterations,
+        'stop_when_significant': args.stop_when_significant,
+        'min_iterations': min(args.min_iterations, args.num_iterations),
+        'workers': args.workers,
+        'shards': args.shards,
+        'seed': args.seed,
+        'results_mode': args.results_mode,
         'players': players
     }
 
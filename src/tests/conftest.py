@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the packages of the repository are imported from the src folder (e.g. games.connect4)
+sys.path.insert(0, str(Path(__file__).parent.parent))
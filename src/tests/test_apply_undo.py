@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.state import Connect4State
+from games.hlpoker.state import HLPokerState
+from games.minesweeper.state import MinesweeperState
+
+
+def connect4_snapshot(state):
+    return ([list(row) for row in state.get_grid()], state.get_hash(), state.get_position_key(),
+            state.get_canonical_key(), state.get_acting_player(), state.is_finished(),
+            [action.get_col() for action in state.get_possible_actions()])
+
+
+def minesweeper_snapshot(state):
+    return ([list(row) for row in state.get_grid()], state.get_acting_player(), state.is_finished(),
+            [state.get_result(pos) for pos in range(0, 2)])
+
+
+def hlpoker_snapshot(state):
+    return (list(state.get_sequence()), state.get_acting_player(), state.is_finished(), state.get_pot(),
+            state.get_current_round(), state.get_possible_actions(), [state.get_result(pos) for pos in range(0, 2)])
+
+
+def assert_undo_reverts_apply(state, snapshot, rng):
+    snapshots = []
+    while not state.is_finished():
+        snapshots.append(snapshot(state))
+        state.apply(rng.choice(list(state.get_possible_actions())))
+    # each undo restores the state before the matching apply
+    while snapshots:
+        state.undo()
+        assert snapshot(state) == snapshots.pop()
+
+
+@pytest.mark.parametrize('state_type', [Connect4State, BitboardConnect4State])
+def test_connect4_undo_restores_the_hash_grid_and_keys(state_type):
+    rng = random.Random(13)
+    for num_rows, num_cols in ((6, 7), (4, 5)):
+        for _ in range(0, 20):
+            assert_undo_reverts_apply(state_type(num_rows, num_cols), connect4_snapshot, rng)
+
+
+def test_minesweeper_undo_restores_the_grid():
+    rng = random.Random(14)
+    random.seed(14)
+    for _ in range(0, 20):
+        assert_undo_reverts_apply(MinesweeperState(), minesweeper_snapshot, rng)
+
+
+def test_hlpoker_undo_restores_the_betting():
+    rng = random.Random(15)
+    for _ in range(0, 50):
+        assert_undo_reverts_apply(HLPokerState(2), hlpoker_snapshot, rng)
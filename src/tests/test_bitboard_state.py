@@ -0,0 +1,57 @@
+import random
+
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.state import Connect4State
+
+
+def assert_same_state(state, bitboard_state):
+    assert [list(row) for row in bitboard_state.get_grid()] == [list(row) for row in state.get_grid()]
+    assert bitboard_state.get_acting_player() == state.get_acting_player()
+    assert bitboard_state.is_finished() == state.is_finished()
+    for pos in range(0, 2):
+        assert bitboard_state.get_result(pos) == state.get_result(pos)
+        assert bitboard_state.get_board(pos) == state.get_board(pos)
+    assert bitboard_state.get_mask() == state.get_mask()
+    assert bitboard_state.get_position_key() == state.get_position_key()
+    assert bitboard_state.get_canonical_key() == state.get_canonical_key()
+    assert [action.get_col() for action in bitboard_state.get_possible_actions()] == \
+           [action.get_col() for action in state.get_possible_actions()]
+
+
+def test_random_games_match_the_list_state():
+    rng = random.Random(11)
+    for num_rows, num_cols in ((6, 7), (5, 4), (7, 8)):
+        for _ in range(0, 30):
+            state = Connect4State(num_rows, num_cols)
+            bitboard_state = BitboardConnect4State(num_rows, num_cols)
+            while not state.is_finished():
+                action = rng.choice(state.get_possible_actions())
+                state.update(action)
+                bitboard_state.update(action)
+                assert_same_state(state, bitboard_state)
+
+
+def test_undo_restores_the_same_state():
+    rng = random.Random(12)
+    for _ in range(0, 30):
+        state = Connect4State()
+        bitboard_state = BitboardConnect4State()
+        num_moves = 0
+        while not state.is_finished():
+            action = rng.choice(state.get_possible_actions())
+            state.apply(action)
+            bitboard_state.apply(action)
+            num_moves += 1
+        for _ in range(0, num_moves):
+            state.undo()
+            bitboard_state.undo()
+            assert_same_state(state, bitboard_state)
+
+
+def test_clones_are_independent():
+    state = BitboardConnect4State()
+    action = state.get_possible_actions()[3]
+    clone = state.clone()
+    clone.update(action)
+    assert state.get_mask() == 0
+    assert clone.get_mask() != 0
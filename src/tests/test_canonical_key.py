@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from games.connect4.action import Connect4Action
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.state import Connect4State
+
+
+@pytest.mark.parametrize('state_type', [Connect4State, BitboardConnect4State])
+def test_mirrored_positions_share_the_canonical_key(state_type):
+    rng = random.Random(18)
+    for num_rows, num_cols in ((6, 7), (5, 4)):
+        for _ in range(0, 20):
+            state = state_type(num_rows, num_cols)
+            mirrored_state = state_type(num_rows, num_cols)
+            while not state.is_finished():
+                action = rng.choice(state.get_possible_actions())
+                state.update(action)
+                mirrored_state.update(Connect4Action(num_cols - 1 - action.get_col()))
+
+                key, mirrored = state.get_canonical_key()
+                mirrored_key, mirrored_mirrored = mirrored_state.get_canonical_key()
+                position_key = state.get_position_key()
+                assert mirrored_state.get_position_key() == \
+                       Connect4State.mirror_position_key(position_key, num_rows, num_cols)
+                assert key == mirrored_key == min(position_key, mirrored_state.get_position_key())
+                # only one of the orientations is the canonical one, unless the position is symmetric
+                is_symmetric = mirrored_state.get_position_key() == position_key
+                assert mirrored != mirrored_mirrored or (is_symmetric and not mirrored)
+
+
+def test_mirroring_a_key_twice_gives_the_same_key():
+    rng = random.Random(19)
+    state = Connect4State()
+    while not state.is_finished():
+        state.update(rng.choice(state.get_possible_actions()))
+        key = state.get_position_key()
+        assert Connect4State.mirror_position_key(Connect4State.mirror_position_key(key, 6, 7), 6, 7) == key
@@ -0,0 +1,47 @@
+from games.connect4.players.heuristic import HeuristicConnect4Player
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+
+
+class CountingHeuristicPlayer(HeuristicConnect4Player):
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.num_played_games = 0
+
+    def event_new_game(self):
+        self.num_played_games += 1
+        super().event_new_game()
+
+
+class UnmemoizedConnect4Simulator(Connect4Simulator):
+
+    def get_initial_state_key(self):
+        return None
+
+
+def play(simulator_type, players, num_iterations):
+    simulator = simulator_type(players)
+    for _ in range(0, num_iterations):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+    return simulator
+
+
+def test_memoized_games_replay_the_same_results():
+    memoized = play(Connect4Simulator, [CountingHeuristicPlayer("h"), MinimaxConnect4Player("m", depth=2)], 6)
+    played = play(UnmemoizedConnect4Simulator, [CountingHeuristicPlayer("h"), MinimaxConnect4Player("m", depth=2)], 6)
+
+    assert list(memoized.get_results()) == list(played.get_results())
+    assert memoized.get_global_score() == played.get_global_score()
+    assert memoized.get_num_games() == played.get_num_games() == 6
+    # only the first game of each seat order was played
+    assert memoized.get_players()[0].num_played_games == 2
+    assert played.get_players()[0].num_played_games == 6
+
+
+def test_games_with_a_random_player_are_not_memoized():
+    player = CountingHeuristicPlayer("h")
+    play(Connect4Simulator, [player, RandomConnect4Player("r")], 4)
+    assert player.num_played_games == 4
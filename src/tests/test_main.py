@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent
+
+
+def run_tournament(*args):
+    result = subprocess.run([sys.executable, 'main.py', *args], cwd=SRC_DIR, capture_output=True, text=True,
+                            timeout=300)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@pytest.mark.parametrize('options', [[], ['--workers', '2'], ['--shards', '2', '--seed', '1']])
+def test_hlpoker_tournament(options):
+    output = run_tournament('--game', 'hlpoker', '--num-iterations', '20', *options,
+                            '--player', 'a', 'RandomHLPokerPlayer', '--player', 'b', 'AlwaysCallHLPokerPlayer')
+    assert 'Leaderboard' in output
+
+
+@pytest.mark.parametrize('options', [[], ['--workers', '2']])
+def test_connect4_tournament(options):
+    output = run_tournament('--game', 'connect4', '--num-iterations', '4', *options,
+                            '--player', 'a', 'RandomConnect4Player', '--player', 'b', 'IterativeMinimaxConnect4Player')
+    assert 'Leaderboard' in output
+    # the search players print their own stats
+    assert 'b: ' in output
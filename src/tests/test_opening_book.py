@@ -0,0 +1,45 @@
+from games.connect4.action import Connect4Action
+from games.connect4.opening_book import OpeningBook, build, enumerate_positions
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+
+NUM_ROWS, NUM_COLS, PLIES, DEPTH = 5, 6, 3, 3
+
+
+def test_book_lookups_match_the_search(tmp_path):
+    path = tmp_path / 'book.bin'
+    build(path, NUM_ROWS, NUM_COLS, PLIES, DEPTH, workers=2, chunk_size=16)
+    book = OpeningBook.open(path)
+    assert book.matches(NUM_ROWS, NUM_COLS, DEPTH)
+
+    positions = enumerate_positions(NUM_ROWS, NUM_COLS, PLIES)
+    assert len(book) == len(positions)
+
+    player = MinimaxConnect4Player("search", DEPTH, opening_book=None)
+    book_player = MinimaxConnect4Player("book", DEPTH, opening_book=path)
+    for moves in positions.values():
+        # both orientations of each position are read from the same record
+        for cols in (moves, [NUM_COLS - 1 - col for col in moves]):
+            state = Connect4State(NUM_ROWS, NUM_COLS)
+            for col in cols:
+                state.update(Connect4Action(col))
+            player.event_new_game()
+            player.set_current_pos(state.get_acting_player())
+            score, action = player.search_root(state, DEPTH)
+
+            assert book.lookup(*state.get_canonical_key()) == (action.get_col(), int(score))
+            assert book_player.get_book_action(state).get_col() == action.get_col()
+
+
+def test_positions_outside_the_book_are_not_found(tmp_path):
+    path = tmp_path / 'book.bin'
+    build(path, NUM_ROWS, NUM_COLS, 1, DEPTH, workers=1)
+    book = OpeningBook.open(path)
+
+    state = Connect4State(NUM_ROWS, NUM_COLS)
+    for col in (0, 1, 2):
+        state.update(Connect4Action(col))
+    assert book.lookup(*state.get_canonical_key()) is None
+    # a book built for another search depth is not used by the player
+    player = MinimaxConnect4Player("book", DEPTH + 1, opening_book=path)
+    assert player.get_book_action(Connect4State(NUM_ROWS, NUM_COLS)) is None
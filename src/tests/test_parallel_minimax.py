@@ -0,0 +1,27 @@
+import random
+
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.players.parallel_minimax import ParallelMinimaxConnect4Player
+from games.connect4.state import Connect4State
+
+
+def test_parallel_search_picks_the_moves_of_the_serial_search():
+    rng = random.Random(16)
+    serial = MinimaxConnect4Player("serial", 4, opening_book=None)
+    with ParallelMinimaxConnect4Player("parallel", 4, workers=2) as parallel:
+        parallel.opening_book = None
+        num_positions = 0
+        while num_positions < 15:
+            state = Connect4State()
+            for _ in range(0, rng.randint(0, 20)):
+                if state.is_finished():
+                    break
+                state.update(rng.choice(state.get_possible_actions()))
+            if state.is_finished():
+                continue
+            num_positions += 1
+
+            for player in (serial, parallel):
+                player.event_new_game()
+                player.set_current_pos(state.get_acting_player())
+            assert parallel.get_action(state).get_col() == serial.get_action(state).get_col()
@@ -0,0 +1,66 @@
+import pickle
+import random
+
+import pytest
+
+from games.connect4.players.qlearning import QLearningConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.q_table import QTable
+
+
+def play(player, num_games):
+    simulator = Connect4Simulator([player, RandomConnect4Player("r")])
+    for _ in range(0, num_games):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+
+
+def test_saved_tables_read_back_identical(tmp_path):
+    rng = random.Random(23)
+    values = {rng.randrange(0, 1 << 60) * 7 + rng.randrange(0, 7): rng.uniform(-1, 1) for _ in range(0, 500)}
+    path = tmp_path / 'q_table.bin'
+    QTable.save(path, 7, QTable.merge(None, values))
+
+    table = QTable.open(path)
+    assert len(table) == len(values)
+    assert table.get_num_actions() == 7
+    assert list(table.items()) == sorted(values.items())
+    assert all(table.lookup(entry) == value for entry, value in values.items())
+    assert table.lookup(max(values) + 1) is None
+    # a pickled table maps the same file again
+    assert list(pickle.loads(pickle.dumps(table)).items()) == sorted(values.items())
+
+    # merged values replace the entries of the table and add the new ones
+    updates = {next(iter(values)): 2.0, (1 << 61) * 7: -2.0}
+    QTable.save(path, 7, QTable.merge(table, updates))
+    assert dict(QTable.open(path).items()) == {**values, **updates}
+
+
+def test_keys_that_do_not_fit_are_refused(tmp_path):
+    path = tmp_path / 'q_table.bin'
+    with pytest.raises(ValueError):
+        QTable.save(path, 7, [((1 << QTable.MAX_KEY_BITS) * 7, 0.0)])
+    assert not path.exists()
+    with pytest.raises(ValueError):
+        QTable.save(path, 1 << QTable.MAX_ACTION_BITS, [])
+
+
+def test_learned_values_survive_a_checkpoint_and_reload(tmp_path):
+    random.seed(23)
+    path = tmp_path / 'q_table.bin'
+    player = QLearningConnect4Player("q", q_table=path, checkpoint_interval=5)
+    play(player, 5)
+    # the checkpoint wrote the values to the table, which the player reads from now on
+    assert player.q_values == {}
+    checkpoint = dict(QTable.open(path).items())
+    assert len(checkpoint) > 0
+
+    play(player, 3)
+    learned = {**checkpoint, **player.q_values}
+    player.save_q_table()
+
+    reloaded = QLearningConnect4Player("q", q_table=path)
+    assert reloaded.num_actions == 7
+    assert dict(reloaded.q_table.items()) == learned
+    assert all(reloaded.get_stored_q_value(key) == value for key, value in learned.items())
@@ -0,0 +1,109 @@
+import random
+
+import numpy as np
+import pytest
+
+from games.connect4.action import Connect4Action
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.players.qlearning import QLearningConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.connect4.state import Connect4State
+from games.connect4.value_function import LinearValueFunction
+
+
+class RecordingQLearningPlayer(QLearningConnect4Player):
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, **kwargs)
+        self.played_keys = set()
+
+    def update_q_values(self, reward):
+        self.played_keys.update(key for key, _ in self.episode)
+        super().update_q_values(reward)
+
+
+def play(players, num_games):
+    simulator = Connect4Simulator(players)
+    for _ in range(0, num_games):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+    return simulator
+
+
+def test_the_trace_is_learned_backwards():
+    player = QLearningConnect4Player("q", learning_rate=0.5, discount_factor=0.9, q_table=None)
+    player.episode = [(1, [1, 2]), (10, [10, 11, 12])]
+    player.update_q_values(1.0)
+
+    # the last move gets the reward, the first one the discounted value of the best move after it
+    assert player.q_values == {10: 0.5, 1: pytest.approx(0.5 * 0.9 * 0.5)}
+    assert player.episode == []
+
+
+def test_only_the_moves_played_are_learned():
+    random.seed(21)
+    player = RecordingQLearningPlayer("q", q_table=None)
+    play([player, RandomConnect4Player("r")], 20)
+    assert set(player.q_values) == player.played_keys
+
+
+@pytest.mark.parametrize('state_type', [Connect4State, BitboardConnect4State])
+def test_state_action_keys_pack_the_canonical_column(state_type):
+    rng = random.Random(22)
+    player = QLearningConnect4Player("q", q_table=None)
+    for _ in range(0, 20):
+        state, mirrored_state = state_type(), state_type()
+        while not state.is_finished():
+            actions = state.get_possible_actions()
+            keys = player.get_state_action_keys(state, actions)
+            assert keys == [player.get_state_action_key(state, action) for action in actions]
+            # the keys of the actions of a state are distinct and unpack to the state key and a column
+            assert len(set(keys)) == len(keys)
+            assert {key // state.get_num_cols() for key in keys} == {player.get_state_key(state)}
+
+            # the mirrored move of the mirrored position has the same key (a symmetric position is its own
+            # mirror image, so its moves are only mirrored as a whole)
+            mirrored_actions = [Connect4Action(state.get_num_cols() - 1 - action.get_col()) for action in actions]
+            mirrored_keys = player.get_state_action_keys(mirrored_state, mirrored_actions)
+            if state.get_position_key() == mirrored_state.get_position_key():
+                assert sorted(mirrored_keys) == sorted(keys)
+            else:
+                assert mirrored_keys == keys
+
+            action = rng.choice(actions)
+            state.update(action)
+            mirrored_state.update(Connect4Action(state.get_num_cols() - 1 - action.get_col()))
+
+
+def test_the_weights_survive_a_checkpoint_and_reload(tmp_path):
+    random.seed(25)
+    path = tmp_path / 'weights.npz'
+    player = QLearningConnect4Player("q", q_table=None, function_approximation=True, batch_size=16,
+                                     checkpoint_interval=10, weights=path)
+    play([player, RandomConnect4Player("r")], 10)
+    num_features = player.value_function.get_num_features()
+    # the memory used does not grow with the number of games learned
+    play([player, RandomConnect4Player("r")], 10)
+    assert player.value_function.weights.shape == (num_features,)
+    assert player.q_values == {}
+
+    reloaded = LinearValueFunction.load(path)
+    assert np.array_equal(reloaded.weights, player.value_function.weights)
+    assert (reloaded.get_num_rows(), reloaded.get_num_cols()) == (6, 7)
+
+    # a player that reads the weights picks the same moves
+    greedy = QLearningConnect4Player("g", q_table=None, exploration_rate=0.0, function_approximation=True,
+                                     weights=path)
+    player.exploration_rate = 0.0
+    state = Connect4State()
+    while not state.is_finished():
+        action = greedy.get_action(state)
+        assert action == player.get_action(state)
+        state.update(action)
+
+    # the weights only fit the board they were learned on
+    with pytest.raises(ValueError):
+        greedy.create_value_function(5, 7)
+    with pytest.raises(ValueError):
+        player.save_q_table()
@@ -0,0 +1,57 @@
+import pickle
+import random
+
+import pytest
+
+from games.results import ResultsStore
+
+
+def random_games(rng, num_games, num_seats):
+    return [(rng.randrange(0, 6), tuple(float(rng.randint(-10, 10)) for _ in range(0, num_seats)),
+             rng.randrange(0, 42), rng.random()) for _ in range(0, num_games)]
+
+
+@pytest.mark.parametrize('mode', [ResultsStore.MEMORY, ResultsStore.SPILL])
+def test_stored_games_read_back_identical(mode):
+    games = random_games(random.Random(7), 250, 3)
+    # a small threshold so most games are spilled, in several chunks, and the last ones stay in memory
+    store = ResultsStore(3, mode, spill_threshold=32)
+    for game in games:
+        store.append(*game)
+
+    assert len(store) == len(games)
+    assert list(store) == games
+    assert [store.get(index) for index in range(0, len(games))] == games
+    assert store.get(-1) == games[-1]
+    # a pickled store (e.g. returned by a worker process) reads its spilled games back into memory
+    assert list(pickle.loads(pickle.dumps(store))) == games
+    store.close()
+
+
+def test_extend_keeps_the_order_of_the_games():
+    rng = random.Random(8)
+    first, second = random_games(rng, 40, 2), random_games(rng, 70, 2)
+    store = ResultsStore(2, ResultsStore.SPILL, spill_threshold=16)
+    other = ResultsStore(2, ResultsStore.MEMORY)
+    for game in first:
+        store.append(*game)
+    for game in second:
+        other.append(*game)
+
+    store.extend(other)
+    assert list(store) == first + second
+    store.close()
+
+
+def test_streaming_only_counts_the_games():
+    games = random_games(random.Random(9), 20, 2)
+    store = ResultsStore(2, ResultsStore.STREAMING)
+    for game in games:
+        store.append(*game)
+    store.extend(store)
+
+    assert len(store) == 40
+    with pytest.raises(ValueError):
+        store.get(0)
+    with pytest.raises(ValueError):
+        ResultsStore(2).extend(store)
@@ -0,0 +1,56 @@
+import random
+
+from games.connect4.action import Connect4Action
+from games.connect4.result import Connect4Result
+from games.connect4.solver import Connect4Solver
+from games.connect4.state import Connect4State
+
+
+def negamax(state: Connect4State):
+    # the exact outcome for the acting player, by exhaustive search
+    if state.is_finished():
+        return {Connect4Result.WIN.value: Connect4Solver.WIN, Connect4Result.DRAW.value: Connect4Solver.DRAW,
+                Connect4Result.LOOSE.value: Connect4Solver.LOSS}[state.get_result(state.get_acting_player())]
+    best = Connect4Solver.LOSS
+    for action in state.get_possible_actions():
+        state.apply(action)
+        best = max(best, -negamax(state))
+        state.undo()
+        if best == Connect4Solver.WIN:
+            break
+    return best
+
+
+def random_endgames(rng, count, min_moves, max_moves):
+    # the positions and their mirror images
+    endgames = []
+    while len(endgames) < count:
+        state, mirrored = Connect4State(), Connect4State()
+        for _ in range(0, rng.randint(min_moves, max_moves)):
+            if state.is_finished():
+                break
+            action = rng.choice(state.get_possible_actions())
+            state.update(action)
+            mirrored.update(Connect4Action(state.get_num_cols() - 1 - action.get_col()))
+        if not state.is_finished():
+            endgames.append((state, mirrored))
+    return endgames
+
+
+def test_solver_matches_exhaustive_search():
+    solver = Connect4Solver()
+    for state, _ in random_endgames(random.Random(19), 40, 30, 34):
+        assert solver.solve(state) == negamax(state)
+
+
+def test_outcome_does_not_depend_on_the_cache():
+    # with a small budget some proofs fail: the answers must be the same with or without cached outcomes, and for
+    # both orientations of a position
+    solver = Connect4Solver(200)
+    for state, mirrored in random_endgames(random.Random(20), 40, 16, 26):
+        Connect4Solver.clear_cache()
+        outcome = solver.solve(state)
+        assert solver.solve(state) == outcome
+        assert solver.solve(mirrored) == outcome
+        Connect4Solver.clear_cache()
+        assert solver.solve(mirrored) == outcome
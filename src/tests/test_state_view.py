@@ -0,0 +1,40 @@
+import pytest
+
+from games.connect4.action import Connect4Action
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.state import Connect4State
+from games.state_view import StateView
+
+
+@pytest.mark.parametrize('state_type', [Connect4State, BitboardConnect4State])
+def test_view_can_not_change_the_state(state_type):
+    state = state_type()
+    state.update(Connect4Action(3))
+    view = StateView(state)
+
+    for getter in (view.get_grid, lambda: view.get_window_occupancy(0)):
+        with pytest.raises(TypeError):
+            getter()[0] = 1
+    if state_type is BitboardConnect4State:
+        with pytest.raises(TypeError):
+            view.get_heights()[0] = 1
+
+    # mutating methods work on a private copy
+    view.apply(Connect4Action(3))
+    assert view.get_cell(state.get_num_rows() - 2, 3) == 1
+    assert state.get_cell(state.get_num_rows() - 2, 3) == state.EMPTY_CELL
+    assert state.get_acting_player() == 1
+
+
+@pytest.mark.parametrize('state_type', [Connect4State, BitboardConnect4State])
+def test_view_reads_like_the_state(state_type):
+    state = state_type()
+    for col in (3, 3, 2, 4):
+        state.update(Connect4Action(col))
+    view = StateView(state)
+
+    assert isinstance(view, state_type)
+    assert [list(row) for row in view.get_grid()] == [list(row) for row in state.get_grid()]
+    assert list(view.get_window_occupancy(1)) == list(state.get_window_occupancy(1))
+    assert view.get_hash() == state.get_hash()
+    assert view.get_num_open_windows(0, 2) == state.get_num_open_windows(0, 2)
@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+
+from games.q_table import QTable
+from train import train
+
+
+def training_settings(tmp_path, **overrides):
+    settings = {
+        'episodes': 200,
+        'actors': 2,
+        'batch_size': 20,
+        'snapshot_interval': 100,
+        'eval_games': 10,
+        'learning_rate': 0.1,
+        'discount_factor': 0.9,
+        'exploration_rate': 0.1,
+        'output': str(tmp_path / 'q_table.bin'),
+        'curve': str(tmp_path / 'curve.csv'),
+        'seed': '24',
+        'num_rows': 6,
+        'num_cols': 7
+    }
+    settings.update(overrides)
+    return settings
+
+
+def test_training_writes_the_table_and_the_curve(tmp_path):
+    settings = training_settings(tmp_path)
+    curve = train(settings)
+
+    # a snapshot is published every snapshot_interval episodes and at the end
+    assert [episodes for episodes, _, _, _ in curve] == sorted(episodes for episodes, _, _, _ in curve)
+    assert curve[-1][0] >= settings['episodes']
+    table = QTable.open(settings['output'])
+    assert table.get_num_actions() == settings['num_cols']
+    assert len(table) == curve[-1][2] > 0
+
+    with open(settings['curve'], newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['episodes', 'seconds', 'q_values', 'score_vs_random']
+    assert len(rows) == len(curve) + 1
+
+    # training further starts from the existing table
+    train(training_settings(tmp_path, curve=None))
+    assert len(QTable.open(settings['output'])) >= len(table)
+
+
+def test_a_table_of_another_board_width_is_refused(tmp_path):
+    settings = training_settings(tmp_path)
+    QTable.save(settings['output'], 6, [])
+    with pytest.raises(ValueError):
+        train(settings)
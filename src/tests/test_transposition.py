@@ -0,0 +1,37 @@
+import random
+
+from games.connect4.players.minimax import MinimaxConnect4Player
+from games.connect4.state import Connect4State
+from games.connect4.transposition import TranspositionTable
+
+
+def random_states(rng, count, min_moves, max_moves):
+    states = []
+    while len(states) < count:
+        state = Connect4State()
+        for _ in range(0, rng.randint(min_moves, max_moves)):
+            if state.is_finished():
+                break
+            state.update(rng.choice(state.get_possible_actions()))
+        if not state.is_finished():
+            states.append(state)
+    return states
+
+
+def test_table_keeps_the_moves_of_the_search():
+    with_table = MinimaxConnect4Player("table", 4, opening_book=None)
+    without_table = MinimaxConnect4Player("plain", 4, transposition_table_bytes=0, opening_book=None)
+    for state in random_states(random.Random(14), 40, 0, 20):
+        for player in (with_table, without_table):
+            player.event_new_game()
+            player.set_current_pos(state.get_acting_player())
+        assert with_table.get_action(state).get_col() == without_table.get_action(state).get_col()
+
+
+def test_lookup_returns_the_stored_entry():
+    table = TranspositionTable(1024 * 1024)
+    table.store(12345, 3, 42, TranspositionTable.LOWER_BOUND, 2)
+    assert table.lookup(12345) == (3, 42, TranspositionTable.LOWER_BOUND, 2)
+    assert table.lookup(54321) is None
+    table.clear()
+    assert table.lookup(12345) is None
@@ -0,0 +1,42 @@
+import random
+
+from games.connect4.bitboard_state import BitboardConnect4State
+from games.connect4.state import Connect4State
+from games.connect4.windows import WindowCounts
+
+
+def assert_counts_match_rescan(state):
+    rescan = WindowCounts.from_grid(state.get_grid(), state.EMPTY_CELL)
+    for player in range(0, 2):
+        assert list(state.get_window_occupancy(player)) == list(rescan.get_occupancy(player))
+        for num_checkers in range(0, 5):
+            assert state.get_num_open_windows(player, num_checkers) == rescan.get_num_open(player, num_checkers)
+            for direction in range(0, len(WindowCounts.DIRECTIONS)):
+                assert state.get_num_open_windows(player, num_checkers, direction) == \
+                       rescan.get_num_open(player, num_checkers, direction)
+
+
+def test_incremental_counts_match_a_rescan():
+    rng = random.Random(20)
+    for state_type in (Connect4State, BitboardConnect4State):
+        for _ in range(0, 20):
+            state = state_type()
+            # the counts are built with the state, then kept up to date by every move
+            num_moves = 0
+            while not state.is_finished():
+                state.apply(rng.choice(state.get_possible_actions()))
+                num_moves += 1
+                assert_counts_match_rescan(state)
+                assert_counts_match_rescan(state.clone())
+            for _ in range(0, num_moves):
+                state.undo()
+                assert_counts_match_rescan(state)
+
+
+def test_open_windows_of_an_empty_board():
+    counts = WindowCounts(6, 7)
+    # 24 horizontal, 21 vertical and 12 of each diagonal
+    assert counts.get_num_open(0, 0) == 69
+    assert counts.get_num_open(1, 0, WindowCounts.HORIZONTAL) == 24
+    assert counts.get_num_open(1, 0, WindowCounts.VERTICAL) == 21
+    assert counts.get_num_open(0, 0, WindowCounts.DIAGONAL) == 12
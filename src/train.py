@@ -0,0 +1,207 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from games.connect4.players.qlearning import QLearningConnect4Player
+from games.connect4.players.random import RandomConnect4Player
+from games.connect4.simulator import Connect4Simulator
+from games.q_table import QTable
+from games.results import ResultsStore
+
+
+class TracingQLearningPlayer(QLearningConnect4Player):
+    """
+    Q-learning player that does not learn by itself: it plays with the values of a Q-table snapshot and keeps the
+    trace of each finished episode (with its reward), so a learner can apply it to the shared table
+    """
+
+    def __init__(self, name, q_table, exploration_rate=0.1):
+        super().__init__(name, exploration_rate=exploration_rate, q_table=q_table)
+        self.traces = []
+
+    def update_q_values(self, reward):
+        self.traces.append((self.episode, reward))
+        self.episode = []
+
+    """
+    switches to a newer snapshot of the Q-table (the file is mapped again, since it was replaced by the learner)
+    """
+    def load_snapshot(self, path):
+        self.q_table = QTable(path)
+
+
+"""
+plays self-play games with the latest snapshot of the Q-table, sending the episode traces to the learner
+"""
+def run_actor(actor_id, settings, traces_queue, snapshot_version, stop):
+    if settings['seed'] is not None:
+        random.seed(f"{settings['seed']}:{actor_id}")
+
+    players = [TracingQLearningPlayer(f"Q{pos}", settings['output'], settings['exploration_rate']) for pos in range(2)]
+    simulator = Connect4Simulator(players, num_rows=settings['num_rows'], num_cols=settings['num_cols'],
+                                  results_mode=ResultsStore.STREAMING)
+    version = None
+    while not stop.is_set():
+        if version != snapshot_version.value:
+            version = snapshot_version.value
+            for player in players:
+                player.load_snapshot(settings['output'])
+
+        for _ in range(0, settings['batch_size']):
+            simulator.run_simulation()
+            simulator.change_player_positions()
+
+        traces = players[0].traces + players[1].traces
+        players[0].traces, players[1].traces = [], []
+        traces_queue.put(traces)
+
+
+"""
+plays the greedy policy of the current Q-table against the random player
+:return: the average score per game of the Q-learning player (1 for a win, -1 for a loss)
+"""
+def evaluate(settings):
+    player = TracingQLearningPlayer("Q", settings['output'], exploration_rate=0.0)
+    simulator = Connect4Simulator([player, RandomConnect4Player("Random")], num_rows=settings['num_rows'],
+                                  num_cols=settings['num_cols'], results_mode=ResultsStore.STREAMING)
+    for _ in range(0, settings['eval_games']):
+        simulator.run_simulation()
+        simulator.change_player_positions()
+    return simulator.get_mean_score("Q")
+
+
+"""
+waits for the next batch of traces of the actors
+:raise RuntimeError: if an actor died (e.g. it raised an exception), since its traces would never arrive
+"""
+def get_traces(traces_queue, actors):
+    while True:
+        for actor in actors:
+            if actor.exitcode is not None:
+                raise RuntimeError(f"Actor process {actor.pid} exited with code {actor.exitcode}")
+        try:
+            return traces_queue.get(timeout=1.0)
+        except queue.Empty:
+            pass
+
+
+"""
+runs the actors and merges their episodes into the Q-table, publishing a snapshot every snapshot_interval episodes
+"""
+def train(settings):
+    learner = QLearningConnect4Player("learner", settings['learning_rate'], settings['discount_factor'],
+                                      q_table=settings['output'])
+    learner.set_board_size(settings['num_rows'], settings['num_cols'])
+    # the actors always find a snapshot, even when the training starts from scratch
+    learner.save_q_table()
+
+    traces_queue = multiprocessing.Queue(maxsize=4 * settings['actors'])
+    snapshot_version = multiprocessing.Value('i', 0)
+    stop = multiprocessing.Event()
+    actors = [multiprocessing.Process(target=run_actor, args=(actor_id, settings, traces_queue, snapshot_version, stop))
+              for actor_id in range(0, settings['actors'])]
+    for actor in actors:
+        actor.start()
+
+    curve = []
+    num_episodes = 0
+    next_snapshot = settings['snapshot_interval']
+    start_time = time.perf_counter()
+    # the time spent evaluating the snapshots is not counted in the throughput
+    eval_time = 0.0
+    try:
+        while num_episodes < settings['episodes']:
+            for episode, reward in get_traces(traces_queue, actors):
+                learner.episode = episode
+                learner.update_q_values(reward)
+                num_episodes += 1
+
+            if num_episodes >= next_snapshot or num_episodes >= settings['episodes']:
+                next_snapshot += settings['snapshot_interval']
+                learner.save_q_table()
+                with snapshot_version.get_lock():
+                    snapshot_version.value += 1
+
+                elapsed = time.perf_counter() - start_time - eval_time
+                eval_start_time = time.perf_counter()
+                score = evaluate(settings) if settings['eval_games'] > 0 else None
+                eval_time += time.perf_counter() - eval_start_time
+                curve.append((num_episodes, elapsed, len(learner.q_table), score))
+                print(f"Episodes: {num_episodes} | {num_episodes / elapsed:.1f} episodes/s | "
+                      f"Q-values: {len(learner.q_table)}" +
+                      (f" | Avg. score vs random: {score:+.3f}" if score is not None else ""))
+    finally:
+        stop.set()
+        # the actors may be blocked sending a batch, so the queue is drained until they exit
+        while any(actor.is_alive() for actor in actors):
+            try:
+                traces_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for actor in actors:
+            actor.join()
+
+    if settings['curve'] is not None:
+        with open(settings['curve'], 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['episodes', 'seconds', 'q_values', 'score_vs_random'])
+            writer.writerows(curve)
+    return curve
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the Connect4 Q-learning player by self-play.')
+    parser.add_argument('--episodes', type=int, default=100000,
+                        help='Number of self-play games to learn from. Defaults to 100000.')
+    parser.add_argument('--actors', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help='Number of actor processes playing the games. Defaults to the number of cpus minus one (the learner).')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Number of games each actor plays before sending their traces to the learner. Defaults to 100.')
+    parser.add_argument('--snapshot-interval', type=int, default=10000,
+                        help='Number of episodes between the snapshots of the Q-table published to the actors. Defaults to 10000.')
+    parser.add_argument('--eval-games', type=int, default=200,
+                        help='Number of games against the random player played at each snapshot for the learning curve. Defaults to 200.')
+    parser.add_argument('--learning-rate', type=float, default=0.1,
+                        help='Learning rate of the Q-learning updates. Defaults to 0.1.')
+    parser.add_argument('--discount-factor', type=float, default=0.9,
+                        help='Discount factor of the future rewards. Defaults to 0.9.')
+    parser.add_argument('--exploration-rate', type=float, default=0.1,
+                        help='Probability of a random move of the actors. Defaults to 0.1.')
+    parser.add_argument('--output', default=str(QLearningConnect4Player.DEFAULT_Q_TABLE_PATH),
+                        help='Path of the Q-table. An existing table is trained further. Defaults to the location the player reads it from.')
+    parser.add_argument('--curve', default=None,
+                        help='Path of a csv file where the learning curve is written.')
+    parser.add_argument('--seed', type=str, default=None,
+                        help='Master seed from which the seed of every actor is derived.')
+    args = parser.parse_args()
+
+    if args.actors < 1:
+        parser.error('The number of actors must be at least 1.')
+
+    if args.batch_size < 1 or args.snapshot_interval < 1:
+        parser.error('The batch size and the snapshot interval must be at least 1.')
+
+    settings = {
+        'episodes': args.episodes,
+        'actors': args.actors,
+        'batch_size': args.batch_size,
+        'snapshot_interval': args.snapshot_interval,
+        'eval_games': args.eval_games,
+        'learning_rate': args.learning_rate,
+        'discount_factor': args.discount_factor,
+        'exploration_rate': args.exploration_rate,
+        'output': os.path.abspath(args.output),
+        'curve': args.curve,
+        'seed': args.seed,
+        'num_rows': 6,
+        'num_cols': 7
+    }
+
+    train(settings)
+
+if __name__ == '__main__':
+    main()